@@ -0,0 +1,154 @@
+# API HTTP (JSON) com os mesmos números do dashboard, sem precisar abrir sessões do Streamlit
+#
+# Uso: python api.py [--host 0.0.0.0] [--port 8080]
+#
+# Todas as rotas aceitam o parâmetro opcional ?countries=Brazil,India (padrão: todos os países).
+# As consultas usam o mesmo store (loader.py) e o mesmo cache de resultados (queries.py) das
+# páginas; o cálculo roda num pool de threads para o event loop continuar atendendo enquanto isso.
+
+import json
+import asyncio
+import argparse
+
+from concurrent.futures import ThreadPoolExecutor
+
+from aiohttp import web
+
+import queries
+
+from loader import ALL_COUNTRIES, get_store
+
+
+executor = ThreadPoolExecutor( max_workers=8, thread_name_prefix='zomato-api' )
+
+
+# --------------------------------------------------------------------------------
+# Funções auxiliares
+# --------------------------------------------------------------------------------
+
+# converte tipos do numpy/pandas que o json padrão não conhece
+def _default( obj ):
+    if hasattr( obj, 'item' ):
+        return obj.item()
+    raise TypeError( f'{type( obj ).__name__} não é serializável em JSON' )
+
+def _dumps( data ):
+    return json.dumps( data, default=_default, ensure_ascii=False )
+
+# lê o filtro de países da query string
+def _countries( request ):
+    valor = request.query.get( 'countries' )
+    if not valor:
+        return ALL_COUNTRIES
+    countries = [pais.strip() for pais in valor.split( ',' ) if pais.strip()]
+    desconhecidos = [pais for pais in countries if pais not in ALL_COUNTRIES]
+    if desconhecidos:
+        raise web.HTTPBadRequest( text=f'países desconhecidos: {", ".join( desconhecidos )}' )
+    return countries
+
+def _choice( request, nome, opcoes ):
+    valor = request.query.get( nome, opcoes[0] )
+    if valor not in opcoes:
+        raise web.HTTPBadRequest( text=f'{nome} deve ser um de: {", ".join( opcoes )}' )
+    return valor
+
+def _number( request, nome, padrao, tipo=float ):
+    try:
+        return tipo( request.query.get( nome, padrao ) )
+    except ValueError:
+        raise web.HTTPBadRequest( text=f'{nome} inválido' )
+
+# pega o snapshot dos países pedidos (lendo partições, se preciso) e executa a consulta
+def _query( query, countries, *args ):
+    snapshot = get_store().current( countries )
+    return snapshot.version, query( snapshot, countries, *args )
+
+# executa uma consulta fora do event loop e devolve a resposta JSON
+async def _run( request, query, *args ):
+    countries = _countries( request )
+    loop = asyncio.get_running_loop()
+    version, resultado = await loop.run_in_executor( executor, _query, query, countries, *args )
+    if hasattr( resultado, 'to_dict' ):
+        resultado = resultado.to_dict( orient='records' )
+    return web.json_response( {'version': version, 'data': resultado}, dumps=_dumps )
+
+
+# --------------------------------------------------------------------------------
+# Rotas
+# --------------------------------------------------------------------------------
+routes = web.RouteTableDef()
+
+@routes.get( '/version' )
+async def version( request ):
+    countries = _countries( request )
+    loop = asyncio.get_running_loop()
+    snapshot = await loop.run_in_executor( executor, get_store().current, countries )
+    resposta = {'version': snapshot.version, 'rows': len( snapshot.df )}
+    # contagens da validação, quando o snapshot veio do csv
+    qualidade = getattr( snapshot, 'quality', None )
+    if qualidade is not None:
+        resposta['quarantine'] = {regra: int( quantidade ) for regra, quantidade in qualidade.counts.items()}
+    return web.json_response( resposta, dumps=_dumps )
+
+@routes.get( '/metrics' )
+async def metrics( request ):
+    return await _run( request, queries.metrics )
+
+@routes.get( '/countries/count' )
+async def countries_count( request ):
+    coluna = _choice( request, 'by', ['restaurant_id', 'city'] )
+    return await _run( request, queries.countries_by_nunique, coluna )
+
+@routes.get( '/countries/mean' )
+async def countries_mean( request ):
+    coluna = _choice( request, 'by', ['votes', 'average_cost_for_two'] )
+    return await _run( request, queries.countries_by_mean, coluna )
+
+@routes.get( '/cities/top' )
+async def cities_top( request ):
+    coluna = _choice( request, 'by', ['restaurant_id', 'cuisines'] )
+    return await _run( request, queries.top_cities_by_nunique, coluna )
+
+@routes.get( '/cities/rating' )
+async def cities_rating( request ):
+    nota = _number( request, 'rating', 4 )
+    maior_ou_menor = _choice( request, 'direction', ['maior', 'menor'] )
+    return await _run( request, queries.top_cities_by_rating, nota, maior_ou_menor )
+
+@routes.get( '/cuisines/rating' )
+async def cuisines_rating( request ):
+    condicao = _choice( request, 'order', ['melhor', 'pior'] )
+    return await _run( request, queries.cuisines_by_rating, condicao )
+
+@routes.get( '/cuisines/best' )
+async def cuisines_best( request ):
+    culinaria = request.query.get( 'cuisine' )
+    if not culinaria:
+        raise web.HTTPBadRequest( text='parâmetro cuisine é obrigatório' )
+    return await _run( request, queries.best_restaurant_by_cuisine, culinaria )
+
+@routes.get( '/restaurants/top' )
+async def restaurants_top( request ):
+    n = _number( request, 'n', 20, int )
+    return await _run( request, queries.top_restaurants, max( 1, min( n, 100 ) ) )
+
+
+# carrega o dataset antes de aceitar conexões, para a primeira requisição não pagar a carga
+async def _warm_up( app ):
+    loop = asyncio.get_running_loop()
+    await loop.run_in_executor( executor, get_store().current )
+
+def create_app():
+    app = web.Application()
+    app.add_routes( routes )
+    app.on_startup.append( _warm_up )
+    return app
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser( description='API JSON do Zomato Dashboard' )
+    parser.add_argument( '--host', default='0.0.0.0' )
+    parser.add_argument( '--port', type=int, default=8080 )
+    args = parser.parse_args()
+
+    web.run_app( create_app(), host=args.host, port=args.port )
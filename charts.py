@@ -0,0 +1,164 @@
+# gráficos e componentes do dashboard, sem dependência do Streamlit
+#
+# As páginas desenham estes objetos com st.plotly_chart/folium_static e o export.py grava os mesmos
+# objetos como HTML estático.
+
+import folium
+import plotly.express as px
+
+from folium.plugins import MarkerCluster
+
+import queries
+
+
+# --------------------------------------------------------------------------------
+# Home
+# --------------------------------------------------------------------------------
+
+# função para montar o mapa com os restaurantes
+def build_map( df1 ):
+    columns = ['city', 'aggregate_rating', 'latitude', 'longitude', 'cuisines', 'average_cost_for_two', 'restaurant_name', 'votes']
+
+    data_plot = ( df1.loc[:, columns] )
+    
+    # Desenhar o mapa
+    map_ = folium.Map( zoom_start=11 )
+
+    marker_cluster = MarkerCluster().add_to(map_)
+
+    for index, location_info in data_plot.iterrows():
+
+        folium.Marker( [location_info['latitude'],
+                    location_info['longitude']],
+                    tiles='Cartodb Positron',
+                    icon=folium.Icon(color=df1["color_name"][index], icon="ok-sign"),
+                    popup = 'nome:{}<br>cidade:{}<br>nota:{}<br>culinária:{}<br>preço p/ dois:{}<br>votos:{}'.format(df1["restaurant_name"][index], df1["city"][index], df1["aggregate_rating"][index], df1["cuisines"][index], df1["average_cost_for_two"][index], df1["votes"][index] ) ).add_to( marker_cluster )
+    return map_
+
+
+# --------------------------------------------------------------------------------
+# Países
+# --------------------------------------------------------------------------------
+
+def country_by_votes_or_cost_for_two( snapshot, countries, coluna ):
+    df_aux = queries.countries_by_mean( snapshot, countries, coluna )
+
+    # definição do label y
+    if coluna == 'votes':
+        label = 'Quantidade Média de Avaliações'
+    else:
+        label = 'Média de Preço de um prato para duas pessoas'
+    fig = px.bar( df_aux, x='country_name', y=coluna, 
+                 text=coluna,
+                 labels=({'country_name':'País', coluna:label}), height=500 )
+    fig.update_traces(texttemplate='%{text:.2s}', textposition='outside')
+    fig.update_layout(uniformtext_minsize=8, uniformtext_mode='hide')
+    return fig
+
+def country_by_restaurant_or_city( snapshot, countries, coluna ):
+    # Quantidade de restaurantes/cidades por país
+    df_aux = queries.countries_by_nunique( snapshot, countries, coluna )
+
+    # definição do label y
+    if coluna == 'restaurant_id':
+        label = 'Restaurantes'
+    else:
+        label = 'Cidades'
+    # gráfico
+    fig = px.bar( df_aux, x='country_name', y=coluna, 
+                 text=coluna, 
+                 labels=( {'country_name':'País', coluna:f'Quantidade de {label}'} ), height=500 )
+    fig.update_traces(texttemplate='%{text:.2s}', textposition='outside')
+    fig.update_layout(uniformtext_minsize=8, uniformtext_mode='hide')
+    return fig
+
+
+# --------------------------------------------------------------------------------
+# Cidades
+# --------------------------------------------------------------------------------
+
+def top_10_best_or_worst_restaurant_by_city( snapshot, countries, nota, maior_ou_menor ):
+    df_aux = queries.top_cities_by_rating( snapshot, countries, nota, maior_ou_menor )
+    fig = px.bar( df_aux, x='city', y='restaurant_id', 
+                 text='restaurant_id', 
+                 color='country_name',
+                 labels=({'city':'País', 'restaurant_id':'Quantidade de Restaurantes', 'country_name': 'País'} ), height=400 )
+    fig.update_traces( texttemplate='%{text:.2s}', textposition='outside' )
+    fig.update_layout( uniformtext_minsize=8, uniformtext_mode='hide' )
+    return fig
+
+
+def top_10_restaurant_or_cuisines_by_cities( snapshot, countries, coluna ):
+    if coluna == 'restaurant_id':
+        label = 'Quantidade de Restaurantes'
+    else:
+        label = 'Quantidade de Tipos de Culinários Únicos'
+    
+    df_aux = queries.top_cities_by_nunique( snapshot, countries, coluna )
+    fig = px.bar( df_aux, x='city', y=coluna, 
+                 text=coluna, 
+                 color='country_name', 
+                 labels=( {'city':'País', coluna:label, 'country_name': 'País'} ), height=400 )
+    fig.update_traces( texttemplate='%{text:.2s}', textposition='outside' )
+    fig.update_layout( uniformtext_minsize=8, uniformtext_mode='hide' )
+    return fig
+
+
+# --------------------------------------------------------------------------------
+# Culinárias
+# --------------------------------------------------------------------------------
+
+# função para plotar gráficos do top 10 melhores/piores tipos culinários
+def best_worst_10_restaurant_by_cuisines( snapshot, countries, condicao ):
+    df_aux = queries.cuisines_by_rating( snapshot, countries, condicao )
+
+    fig = px.bar( df_aux, x='cuisines', y='aggregate_rating', 
+                 text='aggregate_rating', 
+                 labels=({'cuisines':'Tipos de Culinária', 'aggregate_rating':'Média da Avaliação Média'} ), height=400 )
+    fig.update_traces( texttemplate='%{text:.2s}', textposition='outside' )
+    fig.update_layout( uniformtext_minsize=8, uniformtext_mode='hide' )
+    
+    return fig
+
+# função para fazer as métricas dos melhores restaurantes por tipo de culinária e a sua nota
+def best_cuisines( snapshot, countries, culinaria ):
+    melhor = queries.best_restaurant_by_cuisine( snapshot, countries, culinaria )
+    if melhor is None:
+        return culinaria, '-'
+    text_ = ( culinaria ) + ': ' + ( melhor["restaurant_name"] )
+    nota = str( melhor["aggregate_rating"] ) + ( '/5.0' )
+    
+    return text_, nota
+
+
+# --------------------------------------------------------------------------------
+# Avaliações
+# --------------------------------------------------------------------------------
+
+LABELS = {
+    'aggregate_rating': 'Nota',
+    'average_cost_for_two': 'Preço de um prato para duas pessoas',
+    'country_name': 'País',
+    'city': 'Cidade',
+    'cuisines': 'Tipos de Culinária',
+}
+
+# função para plotar a distribuição da nota ou do preço para dois
+def distribution_chart( snapshot, countries, coluna, dimensao, grupo ):
+    df_aux = queries.distribution( snapshot, countries, coluna, dimensao, grupo )
+    fig = px.bar( df_aux, x=coluna, y='count',
+                 labels=( {coluna: LABELS[coluna], 'count': 'Quantidade de Restaurantes'} ), height=400 )
+    return fig
+
+# função para plotar os grupos com mais restaurantes acima/abaixo da nota escolhida
+def rating_threshold_chart( snapshot, countries, dimensao, nota, maior_ou_menor ):
+    df_aux = queries.rating_threshold( snapshot, countries, dimensao, nota, maior_ou_menor )
+    fig = px.bar( df_aux, x=dimensao, y='restaurantes',
+                 text='restaurantes',
+                 color='country_name' if dimensao == 'city' else None,
+                 hover_data=['total', 'fracao'],
+                 labels=( {dimensao: LABELS[dimensao], 'restaurantes': 'Quantidade de Restaurantes', 'country_name': 'País',
+                           'total': 'Total de Restaurantes', 'fracao': 'Fração'} ), height=400 )
+    fig.update_traces( textposition='outside' )
+    fig.update_layout( uniformtext_minsize=8, uniformtext_mode='hide' )
+    return fig
@@ -0,0 +1,167 @@
+# exporta o dashboard da seleção padrão (todos os países) como arquivos estáticos
+#
+# Uso: python export.py [--output static]
+#
+# Gera uma página HTML por visão (index, cities, countries, cuisines), o mapa da home em map.html
+# e os dados de cada gráfico em data/*.json. Os arquivos podem ser servidos por qualquer servidor
+# estático/CDN; o Streamlit fica só para as seleções de países diferentes da padrão.
+
+import os
+import json
+import html
+import argparse
+
+import queries
+
+from plotly.offline import get_plotlyjs_version
+
+from charts import ( build_map, country_by_restaurant_or_city, country_by_votes_or_cost_for_two,
+                     top_10_best_or_worst_restaurant_by_city, top_10_restaurant_or_cuisines_by_cities,
+                     best_worst_10_restaurant_by_cuisines, best_cuisines )
+from loader import ALL_COUNTRIES, get_store
+
+
+OUTPUT_PATH = os.path.join( os.path.dirname( os.path.abspath( __file__ ) ), 'static' )
+
+PAGE = """<!DOCTYPE html>
+<html lang="pt-br">
+<head>
+<meta charset="utf-8">
+<title>{title}</title>
+<script src="https://cdn.plot.ly/plotly-{plotly_version}.min.js"></script>
+<style>
+body {{ font-family: sans-serif; margin: 2rem; }}
+nav a {{ margin-right: 1rem; }}
+.metrics {{ display: flex; gap: 2rem; flex-wrap: wrap; }}
+.metric span {{ display: block; font-size: 2rem; }}
+</style>
+</head>
+<body>
+<nav><a href="index.html">Home</a><a href="countries.html">Países</a><a href="cities.html">Cidades</a><a href="cuisines.html">Culinárias</a></nav>
+<h1>Fome Zero!!!</h1>
+<p>Dados da versão {version} do dataset, com todos os países selecionados.</p>
+{body}
+</body>
+</html>
+"""
+
+
+# --------------------------------------------------------------------------------
+# Funções
+# --------------------------------------------------------------------------------
+
+def _metric( label, valor ):
+    return f'<div class="metric">{html.escape( str( label ) )}<span>{html.escape( str( valor ) )}</span></div>'
+
+def _figure( titulo, fig ):
+    return f'<h3>{html.escape( titulo )}</h3>\n' + fig.to_html( full_html=False, include_plotlyjs=False )
+
+def _write( output, nome, conteudo ):
+    caminho = os.path.join( output, nome )
+    os.makedirs( os.path.dirname( caminho ), exist_ok=True )
+    # arquivo temporário + troca, para o servidor nunca entregar um arquivo pela metade
+    temporario = caminho + '.tmp'
+    with open( temporario, 'w', encoding='utf-8' ) as arquivo:
+        arquivo.write( conteudo )
+    os.replace( temporario, caminho )
+
+def _write_json( output, nome, dados ):
+    if hasattr( dados, 'to_dict' ):
+        dados = dados.to_dict( orient='records' )
+    _write( output, os.path.join( 'data', nome ), json.dumps( dados, default=lambda obj: obj.item(), ensure_ascii=False ) )
+
+def _page( output, nome, titulo, version, partes ):
+    # a mesma versão do plotly.js que acompanha o pacote plotly instalado, para a qual as figuras foram geradas
+    _write( output, nome, PAGE.format( title=html.escape( titulo ), version=html.escape( str( version ) ),
+                                       plotly_version=get_plotlyjs_version(), body='\n'.join( partes ) ) )
+
+
+def export_home( output, snapshot, countries ):
+    metricas = queries.metrics( snapshot, countries )
+    _write_json( output, 'metrics.json', metricas )
+
+    mapa = build_map( snapshot.select( countries ) )
+    # mesmo HTML que o mapa.save() gravaria, mas passando pela troca atômica do _write
+    _write( output, 'map.html', mapa.get_root().render() )
+
+    partes = [
+        '<h2>O melhor lugar para encontrar seu mais novo restaurante favorito!</h2>',
+        '<div class="metrics">',
+        _metric( 'Restaurantes Cadastrados', metricas['restaurantes'] ),
+        _metric( 'Países Cadastrados', metricas['paises'] ),
+        _metric( 'Cidades Cdastradas', metricas['cidades'] ),
+        _metric( 'Avaliações Feitas na Plataforma', metricas['votos'] ),
+        _metric( 'Tipos de Culinárias Oferecidos', metricas['culinarias'] ),
+        '</div>',
+        '<iframe src="map.html" width="100%" height="600" style="border: none;"></iframe>',
+    ]
+    _page( output, 'index.html', 'Home', snapshot.version, partes )
+
+def export_countries( output, snapshot, countries ):
+    partes = []
+    for coluna, titulo in [( 'restaurant_id', 'Quantidade de Restaurantes Registrado por País' ),
+                           ( 'city', 'Quantidade de Cidades Registrado por País' )]:
+        _write_json( output, f'countries_by_{coluna}.json', queries.countries_by_nunique( snapshot, countries, coluna ) )
+        partes.append( _figure( titulo, country_by_restaurant_or_city( snapshot, countries, coluna ) ) )
+    for coluna, titulo in [( 'votes', 'Média de Avaliações feitas por País' ),
+                           ( 'average_cost_for_two', 'Média de Preço de um prato para duas pessoas por País' )]:
+        _write_json( output, f'countries_mean_{coluna}.json', queries.countries_by_mean( snapshot, countries, coluna ) )
+        partes.append( _figure( titulo, country_by_votes_or_cost_for_two( snapshot, countries, coluna ) ) )
+    _page( output, 'countries.html', 'Visão Países', snapshot.version, partes )
+
+def export_cities( output, snapshot, countries ):
+    partes = []
+    _write_json( output, 'cities_by_restaurant_id.json', queries.top_cities_by_nunique( snapshot, countries, 'restaurant_id' ) )
+    partes.append( _figure( 'Top 10 Cidades com mais Restaurantes na Base de Dados',
+                            top_10_restaurant_or_cuisines_by_cities( snapshot, countries, 'restaurant_id' ) ) )
+    for nota, maior_ou_menor, titulo in [( 4, 'maior', 'Quantidade de Restaurantes com nota maior que 4 Registrados por Cidade' ),
+                                         ( 2.5, 'menor', 'Quantidade de Restaurantes com nota menor que 2.5 Registrados por Cidade' )]:
+        _write_json( output, f'cities_rating_{maior_ou_menor}.json', queries.top_cities_by_rating( snapshot, countries, nota, maior_ou_menor ) )
+        partes.append( _figure( titulo, top_10_best_or_worst_restaurant_by_city( snapshot, countries, nota, maior_ou_menor ) ) )
+    _write_json( output, 'cities_by_cuisines.json', queries.top_cities_by_nunique( snapshot, countries, 'cuisines' ) )
+    partes.append( _figure( 'Top 10 Cidades com o maior quantidade de Tipo Culinários Distintos',
+                            top_10_restaurant_or_cuisines_by_cities( snapshot, countries, 'cuisines' ) ) )
+    _page( output, 'cities.html', 'Visão Cidades', snapshot.version, partes )
+
+def export_cuisines( output, snapshot, countries ):
+    partes = ['<h3>Melhores Restaurantes dos Principais tipos Culinários</h3>', '<div class="metrics">']
+    melhores = []
+    for culinaria in queries.FEATURED_CUISINES:
+        melhores.append( queries.best_restaurant_by_cuisine( snapshot, countries, culinaria ) )
+        text_, nota = best_cuisines( snapshot, countries, culinaria )
+        partes.append( _metric( text_, nota ) )
+    partes.append( '</div>' )
+    _write_json( output, 'best_by_cuisine.json', [melhor for melhor in melhores if melhor is not None] )
+
+    top = queries.top_restaurants( snapshot, countries, 20 )
+    _write_json( output, 'top_restaurants.json', top )
+    partes.append( '<h3>Top 20 Melhores Restaurantes</h3>' )
+    partes.append( top.to_html( index=False ) )
+
+    for condicao, titulo in [( 'melhor', 'Top 10 Melhores Tipos de Culinárias' ),
+                             ( 'pior', 'Top 10 Piores Tipos de Culinárias' )]:
+        _write_json( output, f'cuisines_{condicao}.json', queries.cuisines_by_rating( snapshot, countries, condicao ) )
+        partes.append( _figure( titulo, best_worst_10_restaurant_by_cuisines( snapshot, countries, condicao ) ) )
+    _page( output, 'cuisines.html', 'Visão Tipos de Cozinhas', snapshot.version, partes )
+
+
+# função que exporta todas as páginas para a seleção padrão
+def export( output=OUTPUT_PATH ):
+    countries = ALL_COUNTRIES
+    snapshot = get_store().current( countries )
+    os.makedirs( output, exist_ok=True )
+
+    export_home( output, snapshot, countries )
+    export_countries( output, snapshot, countries )
+    export_cities( output, snapshot, countries )
+    export_cuisines( output, snapshot, countries )
+    return snapshot.version
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser( description='Exporta o dashboard padrão como HTML/JSON estático' )
+    parser.add_argument( '--output', default=OUTPUT_PATH )
+    args = parser.parse_args()
+
+    version = export( args.output )
+    print( f'versão {version} exportada em {args.output}' )
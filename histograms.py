@@ -0,0 +1,39 @@
+# histogramas de nota e de preço para dois, pré-calculados por célula (país, cidade, culinária)
+#
+# aggregate_rating tem só umas 50 notas distintas e average_cost_for_two algumas centenas de
+# valores, então cada histograma guarda a contagem exata de restaurantes por valor. Distribuições,
+# percentis e contagens acima/abaixo de uma nota saem do merge (soma) das células escolhidas, sem
+# filtrar nem reagrupar as linhas do dataset.
+
+import pandas as pd
+
+from sketches import CELL_COLUMNS
+
+
+HISTOGRAM_COLUMNS = ['aggregate_rating', 'average_cost_for_two']
+
+
+class HistogramTable:
+    def __init__( self, tables ):
+        # tables: coluna -> DataFrame com CELL_COLUMNS, a coluna e a contagem ['count']
+        self.tables = tables
+
+    # junta as tabelas de várias partições
+    @staticmethod
+    def concat( tabelas ):
+        return HistogramTable( {coluna: pd.concat( [tabela.tables[coluna] for tabela in tabelas], ignore_index=True )
+                                for coluna in HISTOGRAM_COLUMNS} )
+
+    # células dos países escolhidos para uma coluna
+    def select( self, countries, coluna ):
+        df_aux = self.tables[coluna]
+        return df_aux.loc[df_aux['country_name'].isin( countries )]
+
+
+# função que monta os histogramas de todas as células na carga
+def build_histograms( df1 ):
+    return HistogramTable( {coluna: ( df1.groupby( CELL_COLUMNS + [coluna], observed=True )
+                                         .size()
+                                         .rename( 'count' )
+                                         .reset_index() )
+                            for coluna in HISTOGRAM_COLUMNS} )
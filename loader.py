@@ -0,0 +1,568 @@
+# módulo de carregamento do dataset compartilhado entre as páginas do dashboard
+#
+# O dataset é lido, limpo e indexado uma única vez por processo. Uma thread em segundo plano
+# observa o arquivo e, quando ele muda, monta a nova versão fora do caminho das requisições e
+# troca a referência de uma só vez. Cada rerun pega um Snapshot e usa somente ele, então
+# continua vendo dados consistentes mesmo que uma troca aconteça no meio da execução.
+
+import os
+import shutil
+import logging
+import threading
+import time
+
+from dataclasses import dataclass
+
+import inflection
+import numpy as np
+import pandas as pd
+import pyarrow.parquet as pq
+
+import queries
+
+from histograms import HistogramTable, build_histograms
+from shared import SHARED_PATH, attach
+from validation import REQUIRED_COLUMNS, validate
+from sketches import SketchTable, build_sketch_table, use_sketches
+
+
+logger = logging.getLogger( __name__ )
+
+DATASET_PATH = os.environ.get( 'ZOMATO_DATASET', os.path.join( os.path.dirname( os.path.abspath( __file__ ) ), 'dataset', 'zomato.csv' ) )
+
+# diretório com o dataset tratado particionado por país (country_code=<código>/part.parquet)
+PARTITIONS_PATH = os.environ.get( 'ZOMATO_PARTITIONS', os.path.join( os.path.dirname( os.path.abspath( __file__ ) ), 'dataset', 'partitions' ) )
+
+# política para restaurantes repetidos com dados diferentes: latest | votes | flag (ver deduplicate)
+DEDUP_POLICY = os.environ.get( 'ZOMATO_DEDUP_POLICY', 'latest' )
+
+# intervalo, em segundos, entre as verificações de mudança do arquivo
+REFRESH_INTERVAL = float( os.environ.get( 'ZOMATO_REFRESH_INTERVAL', 5 ) )
+
+
+# --------------------------------------------------------------------------------
+# Funções de limpeza
+# --------------------------------------------------------------------------------
+
+# função para remover restaurantes repetidos olhando só a chave ['restaurant_id'].
+# politica define qual linha fica quando as repetições divergem:
+#   latest: a última que aparece no arquivo
+#   votes:  a que tem mais votos
+#   flag:   a primeira, marcada na coluna ['restaurant_conflict']
+# retorna o dataset sem repetições e o relatório de conflitos (as variantes distintas de cada
+# restaurant_id repetido, com as colunas em que divergem)
+def deduplicate( df1, politica=DEDUP_POLICY ):
+    # só a coluna chave é hasheada para o dataset inteiro; o resto só é comparado nas linhas repetidas
+    repetidas = df1.duplicated( 'restaurant_id', keep=False )
+    variantes = df1.loc[repetidas].drop_duplicates()
+    divergencias = variantes.groupby( 'restaurant_id' ).nunique( dropna=False ) > 1
+    divergencias = divergencias.loc[divergencias.any( axis=1 )]
+    nomes = np.array( divergencias.columns )
+    colunas = pd.Series( [', '.join( nomes[linha] ) for linha in divergencias.to_numpy()], index=divergencias.index, name='conflict_columns', dtype=object )
+    conflitos = variantes.loc[variantes['restaurant_id'].isin( colunas.index )].join( colunas, on='restaurant_id' )
+
+    if politica == 'latest':
+        df1 = df1.loc[~df1.duplicated( 'restaurant_id', keep='last' )]
+    elif politica == 'votes':
+        ordem = df1.sort_values( 'votes', ascending=False, kind='mergesort' )
+        df1 = ordem.loc[~ordem.duplicated( 'restaurant_id', keep='first' )].sort_index()
+    elif politica == 'flag':
+        df1 = df1.loc[~df1.duplicated( 'restaurant_id', keep='first' )].copy()
+        df1['restaurant_conflict'] = df1['restaurant_id'].isin( colunas.index )
+    else:
+        raise ValueError( f'política de deduplicação desconhecida: {politica}' )
+
+    return df1, conflitos
+
+# função para excluir colunas com um único valor, removação de dados duplicados e definindo apenas um tipo de culinária para a coluna 'cuisines'.
+# os dados faltantes já foram para a quarentena na validação. retorna também o relatório de conflitos da deduplicação
+def clean_code( df1, politica=DEDUP_POLICY ):
+
+    # removendo a coluna ['Switch to order menu'] pois só tem um único valor
+    df1 = df1.drop( 'switch_to_order_menu', axis=1 )
+
+    # removendo os dados duplicados pelo ['restaurant_id']
+    df1, conflitos = deduplicate( df1, politica )
+
+    # categorizando todos os restaurantes somente por um tipo de culinária
+    df1["cuisines"] = df1.loc[:, "cuisines"].apply( lambda x: x.split( "," )[0] )
+
+    return df1, conflitos
+
+# função para renomear as colunas
+def rename_columns( df1 ):
+    df = df1.copy()
+    title = lambda x: inflection.titleize( x )
+    snakecase = lambda x: inflection.underscore( x )
+    spaces = lambda x: x.replace( " ", "" )
+    cols_old = list( df.columns )
+    cols_old = list( map( title, cols_old ) )
+    cols_old = list( map( spaces, cols_old ) )
+    cols_new = list( map( snakecase, cols_old ) )
+    df.columns = cols_new
+    return df
+
+# nome de cada código de cor, usado na coluna ['color_name']
+COLORS = {
+    "3F7E00": "darkgreen",
+    "5BA829": "green",
+    "9ACD32": "lightgreen",
+    "CDD614": "orange",
+    "FFBA00": "red",
+    "CBCBC8": "darkred",
+    "FF7800": "darkred",
+}
+
+# nome de cada código de país, usado na coluna ['country_name']
+COUNTRIES = {
+    1: "India",
+    14: "Australia",
+    30: "Brazil",
+    37: "Canada",
+    94: "Indonesia",
+    148: "New Zeland",
+    162: "Philippines",
+    166: "Qatar",
+    184: "Singapure",
+    189: "South Africa",
+    191: "Sri Lanka",
+    208: "Turkey",
+    214: "United Arab Emirates",
+    215: "England",
+    216: "United States of America",
+}
+
+COUNTRY_CODES = {nome: codigo for codigo, nome in COUNTRIES.items()}
+
+# seleção padrão das páginas: todos os países
+ALL_COUNTRIES = sorted( COUNTRIES.values() )
+
+# função para criação da coluna ['price_type'] baseado na coluna ['price_range']
+def create_price_type( price_range ):
+    if price_range == 1:
+        return 'cheap'
+    elif price_range == 2:
+        return 'normal'
+    elif price_range == 3:
+        return 'expensive'
+    else:
+        return 'gourmet'
+
+
+# função que lê o csv e aplica todo o tratamento usado pelas páginas.
+# retorna o dataset tratado e o relatório de qualidade: conflitos da deduplicação, quarentena da validação
+# e as contagens de cada regra de validação
+def prepare_dataset( path ):
+    df = pd.read_csv( path )
+
+    # renomeando as colunas
+    df1 = rename_columns( df )
+
+    return prepare_frame( df1, path )
+
+# tratamento de um dataset já com as colunas renomeadas; origem só aparece nos logs
+def prepare_frame( df1, origem ):
+    # validando os dados: linhas inválidas vão para a quarentena em vez de quebrar as páginas
+    df1, quarentena, contagens = validate( df1, COLORS, COUNTRIES )
+    if len( quarentena ):
+        logger.info( '%s linhas em quarentena em %s: %s', len( quarentena ), origem, contagens.to_dict() )
+
+    # limpando os dados
+    df1, conflitos = clean_code( df1 )
+    if len( conflitos ):
+        logger.warning( '%s restaurant_id com dados divergentes em %s', conflitos['restaurant_id'].nunique(), origem )
+
+    # criando a coluna ['color_name'] a partir do código da cor (domínio já garantido pela validação)
+    df1['color_name'] = df1['rating_color'].map( COLORS )
+
+    # criando a coluna ['country_name'] a partir do código do país (domínio já garantido pela validação)
+    df1['country_name'] = df1['country_code'].map( COUNTRIES )
+
+    # executando a função create_price_type para a criação da coluna ['price_type']
+    df1['price_type'] = df1.loc[:, 'price_range'].apply( lambda x: create_price_type( x ) )
+
+    return df1.reset_index( drop=True ), DataQuality( conflitos, quarentena, contagens )
+
+# dataset tratado sem nenhuma linha, com as mesmas colunas que o csv produziria
+def empty_dataset():
+    df1, _ = prepare_frame( pd.DataFrame( columns=REQUIRED_COLUMNS ), 'dataset vazio' )
+    return df1
+
+
+# relatório de qualidade de uma carga do csv
+@dataclass( frozen=True )
+class DataQuality:
+    conflicts: pd.DataFrame
+    quarantine: pd.DataFrame
+    counts: pd.Series
+
+
+# --------------------------------------------------------------------------------
+# Versões do dataset
+# --------------------------------------------------------------------------------
+
+# versão imutável do dataset tratado, junto com os índices montados na carga.
+# sketches só existe no modo de contagem aproximada (ver sketches.py) e quality só quando o
+# snapshot vem do csv (conflitos da deduplicação e quarentena da validação)
+@dataclass( frozen=True )
+class Snapshot:
+    version: int
+    mtime: int
+    df: pd.DataFrame
+    country_index: dict
+    histograms: HistogramTable
+    sketches: SketchTable = None
+    quality: DataQuality = None
+
+    # retorna as linhas dos países escolhidos usando o índice por país em vez de um isin sobre todas as linhas.
+    # o índice guarda as posições de cada país, ou uma faixa (slice) quando o dataset está ordenado por país
+    def select( self, countries ):
+        escolhidos = set( countries ) & self.country_index.keys()
+        # todos os países: o próprio DataFrame, sem copiar nenhuma linha
+        if len( escolhidos ) == len( self.country_index ):
+            return self.df
+        posicoes = [self.country_index[pais] for pais in escolhidos]
+        if not posicoes:
+            return self.df.iloc[[]]
+        if all( isinstance( p, slice ) for p in posicoes ):
+            # faixas vizinhas viram uma só; se sobrar uma faixa, o iloc com slice não copia as linhas do arquivo
+            faixas = []
+            for p in sorted( posicoes, key=lambda faixa: faixa.start ):
+                if faixas and faixas[-1].stop == p.start:
+                    faixas[-1] = slice( faixas[-1].start, p.stop )
+                else:
+                    faixas.append( p )
+            if len( faixas ) == 1:
+                return self.df.iloc[faixas[0]]
+            posicoes = faixas
+        posicoes = [np.arange( p.start, p.stop ) if isinstance( p, slice ) else p for p in posicoes]
+        return self.df.iloc[np.sort( np.concatenate( posicoes ) )]
+
+
+# função que monta os índices, os histogramas e, se for o caso, os sketches de um dataset já tratado.
+# with_sketches=None decide pelo tamanho de df1; uma partição recebe a decisão tomada para o dataset inteiro
+def make_snapshot( df1, version, mtime, quality=None, country_index=None, with_sketches=None ):
+    if country_index is None:
+        country_index = df1.groupby( 'country_name', observed=True ).indices
+    if with_sketches is None:
+        with_sketches = use_sketches( len( df1 ) )
+    histograms = build_histograms( df1 )
+    sketches = build_sketch_table( df1 ) if with_sketches else None
+    return Snapshot( version=version, mtime=mtime, df=df1, country_index=country_index, histograms=histograms, sketches=sketches, quality=quality )
+
+# função que monta uma nova versão completa do dataset (leitura, limpeza e índices)
+def build_snapshot( path, version ):
+    # o mtime é lido antes do arquivo: se ele mudar durante a leitura, a próxima verificação monta outra versão
+    mtime = os.stat( path ).st_mtime_ns
+    df1, qualidade = prepare_dataset( path )
+    return make_snapshot( df1, version, mtime, qualidade )
+
+# função que monta uma versão a partir do arquivo compartilhado (shared.py), sem copiar as colunas
+def build_shared_snapshot( path, version ):
+    mtime = os.stat( path ).st_mtime_ns
+    df1, country_index = attach( path )
+    return make_snapshot( df1, version, mtime, country_index=country_index )
+
+
+class DatasetStore:
+    def __init__( self, path=DATASET_PATH, interval=REFRESH_INTERVAL ):
+        self.path = path
+        self.interval = interval
+        self._lock = threading.Lock()
+        self._snapshot = None
+        self._failed_mtime = None
+        self._worker = None
+
+    # retorna a versão atual; só a primeira chamada do processo paga a carga, as demais esperam por ela.
+    # os países são ignorados aqui: o dataset inteiro fica em memória e a seleção usa o índice por país
+    def current( self, countries=None ):
+        snapshot = self._snapshot
+        if snapshot is None:
+            with self._lock:
+                if self._snapshot is None:
+                    self._snapshot = self._build( 1 )
+                    self._start_worker()
+                snapshot = self._snapshot
+        return snapshot
+
+    def _build( self, version ):
+        return build_snapshot( self.path, version )
+
+    def _start_worker( self ):
+        self._worker = threading.Thread( target=self._watch, name='zomato-refresh', daemon=True )
+        self._worker.start()
+
+    # laço da thread de atualização: monta a nova versão em segundo plano e troca a referência de uma vez
+    def _watch( self ):
+        while True:
+            time.sleep( self.interval )
+            try:
+                self.refresh()
+            except Exception:
+                logger.exception( 'falha ao atualizar o dataset %s', self.path )
+
+    # verifica se o arquivo mudou e, se mudou, publica uma nova versão
+    def refresh( self ):
+        try:
+            mtime = os.stat( self.path ).st_mtime_ns
+        except OSError:
+            return False
+        atual = self._snapshot
+        if mtime == atual.mtime or mtime == self._failed_mtime:
+            return False
+        try:
+            novo = self._build( atual.version + 1 )
+            # agregados da seleção padrão calculados aqui, fora do caminho das requisições
+            queries.warm( novo, ALL_COUNTRIES )
+        except Exception:
+            # arquivo incompleto ou inválido: mantém a versão atual até o arquivo mudar de novo
+            self._failed_mtime = mtime
+            raise
+        self._snapshot = novo
+        logger.info( 'dataset atualizado para a versão %s', novo.version )
+        return True
+
+
+# mesmo comportamento do DatasetStore, mas lendo o arquivo publicado pelo shared.py em vez do csv
+class SharedDatasetStore( DatasetStore ):
+    def __init__( self, path=SHARED_PATH, interval=REFRESH_INTERVAL ):
+        super().__init__( path, interval )
+
+    def _build( self, version ):
+        return build_shared_snapshot( self.path, version )
+
+
+# --------------------------------------------------------------------------------
+# Dataset particionado por país
+# --------------------------------------------------------------------------------
+
+def partition_file( path, codigo ):
+    return os.path.join( path, f'country_code={codigo}', 'part.parquet' )
+
+# códigos dos países que têm partição gravada em path
+def partition_codes( path ):
+    return [codigo for codigo in COUNTRIES if os.path.exists( partition_file( path, codigo ) )]
+
+# número de linhas do dataset particionado, lido só do rodapé de cada arquivo
+def partition_rows( path ):
+    return sum( pq.read_metadata( partition_file( path, codigo ) ).num_rows for codigo in partition_codes( path ) )
+
+# função que grava o dataset tratado em uma partição por country_code, no layout do Hive.
+# partições de países que não estão mais no dataset são apagadas, para não continuarem sendo servidas
+def write_partitions( df1, path=PARTITIONS_PATH ):
+    gravadas = set()
+    for codigo, df_aux in df1.groupby( 'country_code' ):
+        arquivo = partition_file( path, codigo )
+        os.makedirs( os.path.dirname( arquivo ), exist_ok=True )
+        # grava num arquivo temporário e troca de uma vez, para os leitores nunca verem uma partição pela metade
+        temporario = arquivo + '.tmp'
+        df_aux.drop( columns='country_code' ).to_parquet( temporario, index=False )
+        os.replace( temporario, arquivo )
+        gravadas.add( f'country_code={codigo}' )
+
+    for nome in os.listdir( path ):
+        if nome.startswith( 'country_code=' ) and nome not in gravadas:
+            shutil.rmtree( os.path.join( path, nome ) )
+
+# função que lê uma partição e monta o seu snapshot
+def build_partition_snapshot( path, codigo, version, with_sketches ):
+    arquivo = partition_file( path, codigo )
+    mtime = os.stat( arquivo ).st_mtime_ns
+    df1 = pd.read_parquet( arquivo )
+    # o código do país fica no nome do diretório, não dentro do arquivo
+    df1['country_code'] = codigo
+    return make_snapshot( df1, version, mtime, with_sketches=with_sketches )
+
+
+# conjunto de partições (uma por país) vistas como um único snapshot
+class PartitionedSnapshot:
+    def __init__( self, partes, vazio ):
+        self.partes = partes
+        self._vazio = vazio
+        self.version = tuple( ( codigo, parte.version ) for codigo, parte in sorted( partes.items() ) )
+        self.histograms = HistogramTable.concat( [parte.histograms for parte in partes.values()] ) if partes else build_histograms( vazio )
+        # os sketches das partições se juntam por concatenação; se alguma partição não tiver, a contagem é exata
+        if partes and all( parte.sketches is not None for parte in partes.values() ):
+            self.sketches = SketchTable.concat( [parte.sketches for parte in partes.values()] )
+        else:
+            self.sketches = None
+
+    @property
+    def df( self ):
+        return self._concat( [parte.df for parte in self.partes.values()] )
+
+    def select( self, countries ):
+        codigos = {COUNTRY_CODES[pais] for pais in countries if pais in COUNTRY_CODES}
+        return self._concat( [parte.df for codigo, parte in self.partes.items() if codigo in codigos] )
+
+    def _concat( self, frames ):
+        if not frames:
+            return self._vazio
+        if len( frames ) == 1:
+            return frames[0]
+        # ignore_index porque cada partição tem o seu próprio índice começando em zero
+        return pd.concat( frames, ignore_index=True )
+
+
+class PartitionedStore:
+    def __init__( self, path=PARTITIONS_PATH, interval=REFRESH_INTERVAL ):
+        self.path = path
+        self.interval = interval
+        self._lock = threading.Lock()
+        self._partition_locks = {codigo: threading.Lock() for codigo in COUNTRIES}
+        self._partitions = {}
+        self._failed_mtimes = {}
+        self._vazio = None
+        self._sketches = None
+        self._worker = None
+
+    # retorna somente as partições dos países escolhidos; cada uma é lida na primeira vez que é pedida
+    def current( self, countries=None ):
+        if countries is None:
+            countries = COUNTRY_CODES.keys()
+        partes = {}
+        for pais in countries:
+            codigo = COUNTRY_CODES.get( pais )
+            if codigo is None:
+                continue
+            parte = self._partition( codigo )
+            if parte is not None:
+                partes[codigo] = parte
+        return PartitionedSnapshot( partes, self._empty() )
+
+    def _partition( self, codigo ):
+        parte = self._partitions.get( codigo )
+        if parte is not None:
+            return parte
+        with self._partition_locks[codigo]:
+            parte = self._partitions.get( codigo )
+            if parte is None:
+                if not os.path.exists( partition_file( self.path, codigo ) ):
+                    return None
+                parte = build_partition_snapshot( self.path, codigo, 1, self._use_sketches() )
+                self._partitions[codigo] = parte
+        self._start_worker()
+        return parte
+
+    # sketches ou contagem exata, decidido pelo tamanho do dataset inteiro e não de cada partição:
+    # assim toda seleção de países usa o mesmo modo e a seleção com todos os países também usa os sketches
+    def _use_sketches( self ):
+        if self._sketches is None:
+            with self._lock:
+                if self._sketches is None:
+                    self._sketches = use_sketches( partition_rows( self.path ) )
+        return self._sketches
+
+    # DataFrame vazio com as colunas do dataset, usado quando nenhum país está selecionado
+    def _empty( self ):
+        if self._vazio is None:
+            with self._lock:
+                if self._vazio is None:
+                    codigos = partition_codes( self.path )
+                    if codigos:
+                        # só o esquema do arquivo é lido, sem as linhas
+                        df1 = pq.read_schema( partition_file( self.path, codigos[0] ) ).empty_table().to_pandas()
+                        df1['country_code'] = np.array( [], dtype=np.int64 )
+                        self._vazio = df1
+                    else:
+                        # as partições sumiram depois que o store foi criado
+                        self._vazio = empty_dataset()
+        return self._vazio
+
+    def _start_worker( self ):
+        if self._worker is not None:
+            return
+        with self._lock:
+            if self._worker is None:
+                self._worker = threading.Thread( target=self._watch, name='zomato-refresh', daemon=True )
+                self._worker.start()
+
+    def _watch( self ):
+        while True:
+            time.sleep( self.interval )
+            try:
+                self.refresh()
+            except Exception:
+                logger.exception( 'falha ao atualizar as partições em %s', self.path )
+
+    # recarrega em segundo plano as partições já em memória cujo arquivo mudou e descarta as que foram apagadas
+    def refresh( self ):
+        partes = dict( self._partitions )
+        removidas = []
+        novas = {}
+        # o tamanho do dataset pode mudar o modo; partições montadas no outro modo são refeitas
+        sketches = use_sketches( partition_rows( self.path ) )
+        for codigo, atual in partes.items():
+            try:
+                mtime = os.stat( partition_file( self.path, codigo ) ).st_mtime_ns
+            except FileNotFoundError:
+                # o país saiu do dataset
+                removidas.append( codigo )
+                continue
+            except OSError:
+                continue
+            if mtime == self._failed_mtimes.get( codigo ):
+                continue
+            if mtime == atual.mtime and ( atual.sketches is not None ) == sketches:
+                continue
+            try:
+                novas[codigo] = build_partition_snapshot( self.path, codigo, atual.version + 1, sketches )
+            except Exception:
+                self._failed_mtimes[codigo] = mtime
+                logger.exception( 'falha ao ler a partição %s', codigo )
+
+        self._sketches = sketches
+        if not removidas and not novas:
+            return False
+
+        # agregados da seleção padrão (todas as partições) calculados antes da troca
+        for codigo in removidas:
+            del partes[codigo]
+        partes.update( novas )
+        try:
+            queries.warm( PartitionedSnapshot( partes, self._empty() ), ALL_COUNTRIES )
+        except Exception:
+            # como na falha de leitura, as partições novas só são tentadas de novo quando o arquivo mudar
+            for codigo, novo in novas.items():
+                self._failed_mtimes[codigo] = novo.mtime
+            raise
+
+        for codigo in removidas:
+            self._partitions.pop( codigo, None )
+            logger.info( 'partição %s removida', codigo )
+        for codigo, novo in novas.items():
+            self._partitions[codigo] = novo
+            logger.info( 'partição %s atualizada para a versão %s', codigo, novo.version )
+        return True
+
+
+_store = None
+_store_lock = threading.Lock()
+
+# retorna o store único do processo, compartilhado por todas as sessões e páginas.
+# ordem de preferência: dataset particionado (se já houver alguma partição gravada), arquivo compartilhado
+# publicado pelo shared.py e, por fim, o csv
+def get_store():
+    global _store
+    if _store is None:
+        with _store_lock:
+            if _store is None:
+                if partition_codes( PARTITIONS_PATH ):
+                    _store = PartitionedStore()
+                elif os.path.exists( SHARED_PATH ):
+                    _store = SharedDatasetStore()
+                else:
+                    _store = DatasetStore()
+    return _store
+
+
+# gera o dataset particionado a partir do csv: python loader.py
+# os relatórios de conflitos da deduplicação e de quarentena da validação ficam ao lado das partições
+if __name__ == '__main__':
+    df1, qualidade = prepare_dataset( DATASET_PATH )
+    write_partitions( df1 )
+    qualidade.conflicts.to_csv( os.path.join( PARTITIONS_PATH, 'conflicts.csv' ), index=False )
+    qualidade.quarantine.to_csv( os.path.join( PARTITIONS_PATH, 'quarantine.csv' ), index=False )
+    print( f'{len( df1 )} linhas válidas, {len( qualidade.quarantine )} em quarentena' )
+    for regra, quantidade in qualidade.counts.items():
+        print( f'  {regra}: {quantidade}' )
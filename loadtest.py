@@ -0,0 +1,234 @@
+# teste de carga: simula vários usuários usando o dashboard ao mesmo tempo
+#
+# Uso: python loadtest.py [--users 20] [--reruns 10] [--seed 0] [--port 8599]
+#
+# O teste sobe um servidor de verdade (streamlit run home.py) e conversa com ele pelo mesmo
+# websocket que o navegador usa: cada usuário simulado é uma conexão que abre uma página, troca de
+# página e de seleção de países aleatoriamente e mede o tempo de cada rerun, do envio do rerun até
+# o servidor avisar que o script terminou. Isso inclui a execução dos scripts, o estado dos widgets
+# e a serialização dos gráficos e do mapa.
+#
+# No fim são mostrados os percentis p50/p95/p99 da latência, a vazão (reruns por segundo) e a
+# memória do servidor (linux):
+#   memoria_por_sessao_mb  crescimento ao abrir as sessões na seleção padrão, que já está no cache
+#                          antes das medições, dividido pelo número de sessões: o estado de cada
+#                          sessão mais o pico das execuções simultâneas, sem o cache de resultados
+#   memoria_servidor_mb    crescimento total até o fim do teste, com as sessões ainda abertas
+#                          (inclui o cache de resultados das seleções sorteadas)
+#
+# O cliente fala o protocolo do websocket da versão do Streamlit fixada no requirements.txt.
+
+import os
+import sys
+import time
+import random
+import asyncio
+import argparse
+import subprocess
+
+import aiohttp
+import numpy as np
+
+from streamlit.proto.BackMsg_pb2 import BackMsg
+from streamlit.proto.ClientState_pb2 import ClientState
+from streamlit.proto.ForwardMsg_pb2 import ForwardMsg
+
+from loader import ALL_COUNTRIES
+
+
+ROOT = os.path.dirname( os.path.abspath( __file__ ) )
+
+# nomes das páginas como o Streamlit os vê (nome do arquivo sem a extensão)
+PAGES = ['home', 'countries', 'cities', 'cuisines', 'ratings']
+
+
+# --------------------------------------------------------------------------------
+# Funções
+# --------------------------------------------------------------------------------
+
+# memória residente de um processo em bytes; None fora do linux
+def rss_bytes( pid ):
+    try:
+        with open( f'/proc/{pid}/statm' ) as arquivo:
+            return int( arquivo.read().split()[1] ) * os.sysconf( 'SC_PAGE_SIZE' )
+    except OSError:
+        return None
+
+# seleção aleatória de países: metade das vezes a seleção padrão (todos), nas outras um subconjunto
+def random_countries( rng ):
+    if rng.random() < 0.5:
+        return list( ALL_COUNTRIES )
+    return rng.sample( ALL_COUNTRIES, rng.randint( 1, len( ALL_COUNTRIES ) ) )
+
+
+# uma aba do navegador: conexão com o servidor e o estado que o frontend guardaria
+class Session:
+    def __init__( self, ws, timeout ):
+        self.ws = ws
+        self.timeout = timeout
+        self.page = None
+        self.page_script_hash = ''
+        self.multiselect = None
+        # o servidor fecha conexões que passam 30s sem responder ao ping dele, então a conexão é lida o
+        # tempo todo (o aiohttp responde aos pings durante a leitura), mesmo quando a sessão está parada
+        self._mensagens = asyncio.Queue()
+        self._leitor = asyncio.create_task( self._read() )
+
+    async def _read( self ):
+        async for recebida in self.ws:
+            await self._mensagens.put( recebida )
+        await self._mensagens.put( None )
+
+    async def close( self ):
+        await self.ws.close()
+        await self._leitor
+
+    # abre uma página com os widgets nos valores iniciais
+    async def open( self, page ):
+        self.page = page
+        return await self._rerun( ClientState( page_name=page ) )
+
+    # troca a seleção de países da página atual, como o multiselect da sidebar faz
+    async def select( self, countries ):
+        estado = ClientState( page_script_hash=self.page_script_hash )
+        widget = estado.widget_states.widgets.add()
+        widget.id = self.multiselect.id
+        widget.int_array_value.data.extend( [list( self.multiselect.options ).index( pais ) for pais in countries] )
+        return await self._rerun( estado )
+
+    # envia o rerun e lê as mensagens até o fim do script; retorna a latência em segundos
+    async def _rerun( self, estado ):
+        mensagem = BackMsg()
+        mensagem.rerun_script.CopyFrom( estado )
+        inicio = time.perf_counter()
+        await self.ws.send_bytes( mensagem.SerializeToString() )
+
+        erros = []
+        while True:
+            recebida = await asyncio.wait_for( self._mensagens.get(), self.timeout )
+            if recebida is None or recebida.type != aiohttp.WSMsgType.BINARY:
+                raise RuntimeError( f'{self.page}: conexão encerrada pelo servidor' )
+            msg = ForwardMsg()
+            msg.ParseFromString( recebida.data )
+            tipo = msg.WhichOneof( 'type' )
+
+            if tipo == 'new_session':
+                self.page_script_hash = msg.new_session.page_script_hash
+            elif tipo == 'delta' and msg.delta.WhichOneof( 'type' ) == 'new_element':
+                elemento = msg.delta.new_element
+                if elemento.WhichOneof( 'type' ) == 'multiselect':
+                    self.multiselect = elemento.multiselect
+                elif elemento.WhichOneof( 'type' ) == 'exception':
+                    erros.append( elemento.exception.message )
+            elif tipo == 'page_not_found':
+                raise RuntimeError( f'página não encontrada: {self.page}' )
+            elif tipo == 'script_finished':
+                if msg.script_finished == ForwardMsg.FINISHED_WITH_COMPILE_ERROR:
+                    erros.append( 'erro de compilação' )
+                break
+
+        latencia = time.perf_counter() - inicio
+        if erros:
+            raise RuntimeError( f'{self.page}: {erros[0]}' )
+        return latencia
+
+
+# demais reruns de uma sessão: troca de página em 1/3 deles, e de seleção de países nos outros
+async def navigate( sessao, rng, reruns, think_time ):
+    latencias = []
+    for _ in range( reruns ):
+        await asyncio.sleep( think_time )
+        if rng.random() < 1 / 3:
+            latencias.append( await sessao.open( rng.choice( PAGES ) ) )
+        else:
+            latencias.append( await sessao.select( random_countries( rng ) ) )
+    return latencias
+
+
+async def _load( url, pid, users, reruns, seed, think_time, timeout ):
+    async with aiohttp.ClientSession() as http:
+        # espera o servidor subir
+        limite = time.monotonic() + timeout
+        while True:
+            try:
+                async with http.get( f'{url}/_stcore/health' ) as resposta:
+                    if resposta.status == 200:
+                        break
+            except aiohttp.ClientConnectionError:
+                pass
+            if time.monotonic() > limite:
+                raise RuntimeError( f'o servidor não respondeu em {url}' )
+            await asyncio.sleep( 0.5 )
+
+        async def conectar():
+            ws = await http.ws_connect( f'{url}/_stcore/stream', protocols=['streamlit'], max_msg_size=0 )
+            return Session( ws, timeout )
+
+        # a carga do dataset, os imports dos scripts e a seleção padrão de cada página ficam fora das medições
+        aquecimento = await conectar()
+        for page in PAGES:
+            await aquecimento.open( page )
+        await aquecimento.close()
+
+        rngs = [random.Random( seed + usuario ) for usuario in range( users )]
+        memoria_inicial = rss_bytes( pid )
+        inicio = time.perf_counter()
+
+        # primeira página de cada sessão na seleção padrão: o crescimento da memória é o estado das sessões
+        sessoes = await asyncio.gather( *[conectar() for _ in range( users )] )
+        latencias = list( await asyncio.gather( *[sessao.open( rng.choice( PAGES ) ) for sessao, rng in zip( sessoes, rngs )] ) )
+        memoria_sessoes = rss_bytes( pid )
+
+        por_sessao = await asyncio.gather( *[navigate( sessao, rng, reruns - 1, think_time ) for sessao, rng in zip( sessoes, rngs )] )
+        latencias += [latencia for latencias_sessao in por_sessao for latencia in latencias_sessao]
+        duracao = time.perf_counter() - inicio
+        memoria_final = rss_bytes( pid )
+
+        for sessao in sessoes:
+            await sessao.close()
+
+    latencias = np.array( latencias )
+    resultado = {
+        'reruns': len( latencias ),
+        'duracao_s': duracao,
+        'vazao_reruns_s': len( latencias ) / duracao,
+        'p50_ms': np.percentile( latencias, 50 ) * 1000,
+        'p95_ms': np.percentile( latencias, 95 ) * 1000,
+        'p99_ms': np.percentile( latencias, 99 ) * 1000,
+        'max_ms': latencias.max() * 1000,
+    }
+    if memoria_inicial is not None:
+        resultado['memoria_por_sessao_mb'] = max( memoria_sessoes - memoria_inicial, 0 ) / users / 2 ** 20
+        resultado['memoria_servidor_mb'] = max( memoria_final - memoria_inicial, 0 ) / 2 ** 20
+    return resultado
+
+
+# sobe o servidor do dashboard, executa o teste e derruba o servidor
+def run( users, reruns, seed, think_time, cache, port, timeout ):
+    env = dict( os.environ )
+    if not cache:
+        env['ZOMATO_CACHE_SIZE'] = '0'
+    comando = [sys.executable, '-m', 'streamlit', 'run', 'home.py', '--server.headless', 'true', '--server.port', str( port ),
+               '--browser.gatherUsageStats', 'false', '--server.fileWatcherType', 'none']
+    servidor = subprocess.Popen( comando, cwd=ROOT, env=env, stdout=subprocess.DEVNULL )
+    try:
+        return asyncio.run( _load( f'http://localhost:{port}', servidor.pid, users, reruns, seed, think_time, timeout ) )
+    finally:
+        servidor.terminate()
+        servidor.wait()
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser( description='Teste de carga do Zomato Dashboard' )
+    parser.add_argument( '--users', type=int, default=20, help='sessões simultâneas' )
+    parser.add_argument( '--reruns', type=int, default=10, help='reruns por sessão' )
+    parser.add_argument( '--seed', type=int, default=0 )
+    parser.add_argument( '--think-time', type=float, default=0.0, help='pausa, em segundos, entre os reruns de uma sessão' )
+    parser.add_argument( '--no-cache', action='store_true', help='desliga o cache de resultados das consultas no servidor' )
+    parser.add_argument( '--port', type=int, default=8599, help='porta do servidor subido para o teste' )
+    parser.add_argument( '--timeout', type=float, default=600, help='tempo máximo, em segundos, de um rerun' )
+    args = parser.parse_args()
+
+    resultado = run( args.users, args.reruns, args.seed, args.think_time, not args.no_cache, args.port, args.timeout )
+    for chave, valor in resultado.items():
+        print( f'{chave:>24}: {valor:.2f}' if isinstance( valor, float ) else f'{chave:>24}: {valor}' )
@@ -0,0 +1,83 @@
+# imports
+
+from PIL import Image
+
+import streamlit as st
+
+import queries
+
+from charts import LABELS, distribution_chart, rating_threshold_chart
+from loader import get_store
+
+st.set_page_config( page_title='Visão Avaliações', page_icon='⭐', layout='wide' )
+
+# ===================================================================================================
+# --------------------------------- Inicio da Estrutura lógica do código ----------------------------
+# ===================================================================================================
+
+
+# =======================================
+# Barra Lateral
+# =======================================
+st.header( 'Fome Zero!!!' )
+
+st.sidebar.title( 'Fome Zero' )
+image = Image.open( 'logo.png' )
+st.sidebar.image( image, width=280 )
+
+st.sidebar.subheader( 'Filtros' )
+
+country_options = st.sidebar.multiselect(
+                    'Escolha os países que deseja visulizar as Avaliações',
+                    ['Philippines', 'Brazil', 'Australia', 'United States of America',
+                    'Canada', 'Singapure', 'United Arab Emirates', 'India',
+                    'Indonesia', 'New Zeland', 'England', 'Qatar', 'South Africa',
+                    'Sri Lanka', 'Turkey'],
+                    default=['Philippines', 'Brazil', 'Australia', 'United States of America',
+                    'Canada', 'Singapure', 'United Arab Emirates', 'India',
+                    'Indonesia', 'New Zeland', 'England', 'Qatar', 'South Africa',
+                    'Sri Lanka', 'Turkey'] )
+
+dimensao = st.sidebar.selectbox( 'Agrupar por', ['country_name', 'city', 'cuisines'], format_func=lambda x: LABELS[x] )
+
+coluna = st.sidebar.radio( 'Métrica', ['aggregate_rating', 'average_cost_for_two'], format_func=lambda x: LABELS[x] )
+
+# -----------------------
+# import dataset
+# -----------------------
+# versão atual do dataset, já tratada e indexada; os gráficos desta página saem só dos histogramas
+# pré-calculados na carga, então mexer nos filtros não reagrupa as linhas do dataset
+snapshot = get_store().current( country_options )
+
+# =======================================
+# Layout no Streamlit
+# =======================================
+df_percentis = queries.percentiles( snapshot, country_options, coluna, dimensao, ( 0.1, 0.25, 0.5, 0.75, 0.9 ) )
+
+with st.container():
+    st.markdown( f'### Distribuição de {LABELS[coluna]}' )
+    if coluna == 'average_cost_for_two':
+        st.caption( 'Preços na moeda local de cada país: compare grupos de um mesmo país.' )
+
+    grupos = df_percentis[dimensao].drop_duplicates().tolist()
+    grupo = st.selectbox( f'{LABELS[dimensao]}', ['Todos'] + grupos )
+    fig = distribution_chart( snapshot, country_options, coluna, dimensao, None if grupo == 'Todos' else grupo )
+    st.plotly_chart( fig, use_container_width=True )
+
+with st.container():
+    st.markdown( f'### Percentis de {LABELS[coluna]} por {LABELS[dimensao]}' )
+    st.dataframe( df_percentis, use_container_width=True )
+
+with st.container():
+    st.markdown( f'### Top 10 {LABELS[dimensao]} por Quantidade de Restaurantes em relação à Nota' )
+
+    col1, col2 = st.columns( 2 )
+
+    with col1:
+        nota = st.slider( 'Nota', min_value=0.0, max_value=5.0, value=4.0, step=0.1 )
+
+    with col2:
+        maior_ou_menor = st.radio( 'Restaurantes com nota', ['maior', 'menor'], format_func=lambda x: f'{x} ou igual à escolhida', horizontal=True )
+
+    fig = rating_threshold_chart( snapshot, country_options, dimensao, nota, maior_ou_menor )
+    st.plotly_chart( fig, use_container_width=True )
@@ -0,0 +1,340 @@
+# consultas do dashboard, sem nenhuma dependência de interface
+#
+# Cada consulta recebe o snapshot do dataset e a lista de países escolhidos e devolve os dados já
+# agregados que as páginas (e a API) desenham. Os resultados ficam num cache LRU compartilhado pelo
+# processo, indexado pela versão do snapshot: quando o dataset é atualizado as chaves antigas deixam
+# de ser usadas e saem do cache naturalmente. Quando várias sessões pedem a mesma chave ao mesmo
+# tempo, só a primeira calcula e as outras esperam pelo resultado dela. Os DataFrames retornados são
+# compartilhados entre sessões e não devem ser alterados por quem chama.
+
+import os
+import threading
+
+from collections import OrderedDict
+from concurrent.futures import Future
+from functools import wraps
+
+import numpy as np
+import pandas as pd
+
+
+# quantidade de resultados guardados; ZOMATO_CACHE_SIZE=0 desliga o cache
+CACHE_SIZE = int( os.environ.get( 'ZOMATO_CACHE_SIZE', 512 ) )
+
+
+class ResultCache:
+    def __init__( self, maxsize=CACHE_SIZE ):
+        self.maxsize = maxsize
+        self._data = OrderedDict()
+        # chave -> Future dos cálculos em andamento
+        self._pending = {}
+        self._lock = threading.Lock()
+
+    def put( self, key, value ):
+        with self._lock:
+            self._data[key] = value
+            self._data.move_to_end( key )
+            while len( self._data ) > self.maxsize:
+                self._data.popitem( last=False )
+
+    # retorna o valor da chave, calculando com compute() só se ninguém já estiver calculando a mesma chave
+    def get_or_compute( self, key, compute ):
+        with self._lock:
+            if key in self._data:
+                self._data.move_to_end( key )
+                return self._data[key]
+            futuro = self._pending.get( key )
+            calcular = futuro is None
+            if calcular:
+                futuro = self._pending[key] = Future()
+
+        if not calcular:
+            return futuro.result()
+
+        try:
+            valor = compute()
+        except BaseException as erro:
+            with self._lock:
+                del self._pending[key]
+            futuro.set_exception( erro )
+            raise
+        self.put( key, valor )
+        with self._lock:
+            del self._pending[key]
+        futuro.set_result( valor )
+        return valor
+
+
+result_cache = ResultCache()
+
+
+# chave do cache: consulta, versão do dataset, países (sem ordem nem repetição) e argumentos
+def _cache_key( func, snapshot, countries, args ):
+    return ( func.__name__, snapshot.version, tuple( sorted( set( countries ) ) ), args )
+
+# decorador que transforma uma função sobre o df1 filtrado em uma consulta cacheada (snapshot, países, *args).
+# uma versão alternativa que usa os sketches do snapshot pode ser registrada com @consulta.approximate;
+# ela recebe ( sketches, países, *args ) e só é usada quando o snapshot tem sketches
+def cached_query( func ):
+    @wraps( func )
+    def wrapper( snapshot, countries, *args ):
+        def compute():
+            sketches = getattr( snapshot, 'sketches', None )
+            if wrapper.approximate_func is not None and sketches is not None:
+                return wrapper.approximate_func( sketches, countries, *args )
+            return func( snapshot.select( countries ), *args )
+        return result_cache.get_or_compute( _cache_key( func, snapshot, countries, args ), compute )
+
+    def approximate( aprox ):
+        wrapper.approximate_func = aprox
+        return aprox
+
+    wrapper.approximate_func = None
+    wrapper.approximate = approximate
+    return wrapper
+
+# decorador para consultas servidas pelos histogramas do snapshot: a função recebe ( histograms, países, *args )
+def cached_histogram_query( func ):
+    @wraps( func )
+    def wrapper( snapshot, countries, *args ):
+        return result_cache.get_or_compute( _cache_key( func, snapshot, countries, args ),
+                                            lambda: func( snapshot.histograms, countries, *args ) )
+    return wrapper
+
+
+# --------------------------------------------------------------------------------
+# Home
+# --------------------------------------------------------------------------------
+
+# métricas gerais da home
+@cached_query
+def metrics( df1 ):
+    return {
+        'restaurantes': int( df1['restaurant_id'].nunique() ),
+        'paises': int( df1['country_name'].nunique() ),
+        'cidades': int( df1['city'].nunique() ),
+        'votos': int( df1['votes'].sum() ),
+        'culinarias': int( df1['cuisines'].nunique() ),
+    }
+
+@metrics.approximate
+def _metrics_approximate( sketches, countries ):
+    mask = sketches.mask( countries )
+    cells = sketches.cells.loc[mask]
+    return {
+        'restaurantes': sketches.distinct( mask ),
+        'paises': int( cells['country_name'].nunique() ),
+        'cidades': int( cells['city'].nunique() ),
+        'votos': int( cells['votes'].sum() ),
+        'culinarias': int( cells['cuisines'].nunique() ),
+    }
+
+
+# --------------------------------------------------------------------------------
+# Países
+# --------------------------------------------------------------------------------
+
+# média de votos/preço para dois por país
+@cached_query
+def countries_by_mean( df1, coluna ):
+    return ( df1.loc[:, ['country_name', coluna]]
+                .groupby( 'country_name', observed=True )
+                .mean()
+                .sort_values( coluna, ascending=False )
+                .reset_index() )
+
+# quantidade de restaurantes/cidades únicos por país
+@cached_query
+def countries_by_nunique( df1, coluna ):
+    return ( df1.loc[:, ['country_name', coluna]]
+                .groupby( 'country_name', observed=True )
+                .nunique()
+                .sort_values( coluna, ascending=False )
+                .reset_index() )
+
+@countries_by_nunique.approximate
+def _countries_by_nunique_approximate( sketches, countries, coluna ):
+    mask = sketches.mask( countries )
+    if coluna == 'restaurant_id':
+        df_aux = sketches.distinct_by( mask, ['country_name'] )
+    else:
+        # as chaves das células já são exatas para as demais colunas
+        df_aux = sketches.cells.loc[mask, ['country_name', coluna]].groupby( 'country_name', observed=True ).nunique().reset_index()
+    return df_aux.sort_values( coluna, ascending=False ).reset_index( drop=True )
+
+
+# --------------------------------------------------------------------------------
+# Cidades
+# --------------------------------------------------------------------------------
+
+# top 10 cidades com mais restaurantes acima ('maior') ou abaixo ('menor') de uma nota
+@cached_query
+def top_cities_by_rating( df1, nota, maior_ou_menor ):
+    if maior_ou_menor == 'maior':
+        linhas_selecionadas = df1['aggregate_rating'] >= nota
+        ordenador = False
+    else:
+        linhas_selecionadas = df1['aggregate_rating'] <= nota
+        ordenador = True
+
+    df_aux = ( df1.loc[linhas_selecionadas, ['city', 'country_name', 'restaurant_id']]
+              .groupby( ['city', 'country_name'], observed=True )
+              .nunique()
+              .sort_values( 'restaurant_id', ascending=ordenador )
+              .reset_index() )
+    return df_aux.head( 10 )
+
+# top 10 cidades com mais restaurantes/tipos de culinária únicos
+@cached_query
+def top_cities_by_nunique( df1, coluna ):
+    df_aux = ( df1.loc[:, ['city', 'country_name', coluna]]
+              .groupby( ['city', 'country_name'], observed=True )
+              .nunique()
+              .sort_values( coluna, ascending=False )
+              .reset_index() )
+    return df_aux.head( 10 )
+
+@top_cities_by_nunique.approximate
+def _top_cities_by_nunique_approximate( sketches, countries, coluna ):
+    mask = sketches.mask( countries )
+    if coluna == 'restaurant_id':
+        df_aux = sketches.distinct_by( mask, ['city', 'country_name'] )
+    else:
+        df_aux = sketches.cells.loc[mask, ['city', 'country_name', coluna]].groupby( ['city', 'country_name'], observed=True ).nunique().reset_index()
+    return df_aux.sort_values( coluna, ascending=False ).reset_index( drop=True ).head( 10 )
+
+
+# --------------------------------------------------------------------------------
+# Culinárias
+# --------------------------------------------------------------------------------
+
+# top 10 melhores ('melhor') ou piores ('pior') tipos culinários pela média da avaliação
+@cached_query
+def cuisines_by_rating( df1, condicao ):
+    ordenacao = condicao != 'melhor'
+
+    df_aux = ( df1.loc[:, ['cuisines', 'aggregate_rating']]
+                  .groupby( 'cuisines', observed=True )
+                  .mean()
+                  .sort_values( 'aggregate_rating', ascending=ordenacao )
+                  .reset_index() )
+    df_aux['aggregate_rating'] = np.round( df_aux['aggregate_rating'], 1 )
+    return df_aux.head( 10 )
+
+# melhor restaurante de um tipo de culinária; None quando a culinária não aparece na seleção
+@cached_query
+def best_restaurant_by_cuisine( df1, culinaria ):
+    linhas_selecionadas = df1['cuisines'] == culinaria
+    avaliacoes = ( df1.loc[linhas_selecionadas, ['restaurant_name', 'restaurant_id', 'aggregate_rating']]
+                      .sort_values( ['aggregate_rating', 'restaurant_id'], ascending=[False, True] ) )
+    if avaliacoes.empty:
+        return None
+    melhor = avaliacoes.iloc[0]
+    return {
+        'cuisine': culinaria,
+        'restaurant_id': int( melhor['restaurant_id'] ),
+        'restaurant_name': melhor['restaurant_name'],
+        'aggregate_rating': float( melhor['aggregate_rating'] ),
+    }
+
+# top n restaurantes por nota e quantidade de votos
+@cached_query
+def top_restaurants( df1, n ):
+    cols = ['restaurant_id', 'restaurant_name', 'country_name', 'city', 'cuisines', 'average_cost_for_two', 'aggregate_rating', 'votes', 'currency']
+    df_aux = ( df1.loc[:, cols]
+                  .sort_values( ['aggregate_rating', 'votes', 'restaurant_id'], ascending=[False, False, True] )
+                  .reset_index( drop=True ) )
+    return df_aux.head( n )
+
+
+# --------------------------------------------------------------------------------
+# Avaliações
+# --------------------------------------------------------------------------------
+
+# colunas de agrupamento de cada dimensão; cidades com o mesmo nome em países diferentes ficam separadas
+DIMENSIONS = {
+    'country_name': ['country_name'],
+    'city': ['city', 'country_name'],
+    'cuisines': ['cuisines'],
+}
+
+# distribuição (valor -> quantidade de restaurantes) da nota ou do preço para dois.
+# grupo opcional restringe a um valor da dimensão (ex.: uma culinária)
+@cached_histogram_query
+def distribution( histograms, countries, coluna, dimensao, grupo ):
+    df_aux = histograms.select( countries, coluna )
+    if grupo is not None:
+        df_aux = df_aux.loc[df_aux[dimensao] == grupo]
+    return ( df_aux.groupby( coluna, observed=True )['count']
+                   .sum()
+                   .reset_index() )
+
+# quantidade de restaurantes, média e percentis da nota ou do preço para dois por grupo da dimensão.
+# os percentis são exatos: o primeiro valor em que a contagem acumulada alcança a fração pedida
+@cached_histogram_query
+def percentiles( histograms, countries, coluna, dimensao, quantis ):
+    grupos = DIMENSIONS[dimensao]
+    df_aux = ( histograms.select( countries, coluna )
+                         .groupby( grupos + [coluna], observed=True )['count']
+                         .sum()
+                         .reset_index() )
+    por_grupo = df_aux.groupby( grupos, observed=True )['count']
+    acumulado = por_grupo.cumsum()
+    total = por_grupo.transform( 'sum' )
+
+    resultado = por_grupo.sum().rename( 'restaurantes' ).to_frame()
+    soma = ( df_aux[coluna] * df_aux['count'] ).groupby( [df_aux[g] for g in grupos], observed=True ).sum()
+    resultado['media'] = np.round( soma / resultado['restaurantes'], 2 )
+    for quantil in quantis:
+        atingiu = acumulado >= quantil * total
+        resultado[f'p{round( quantil * 100 )}'] = df_aux.loc[atingiu].groupby( grupos, observed=True )[coluna].first()
+    return resultado.sort_values( 'restaurantes', ascending=False ).reset_index()
+
+# top 10 grupos da dimensão com mais restaurantes acima ('maior') ou abaixo ('menor') de uma nota,
+# junto com a fração que eles representam no grupo
+@cached_histogram_query
+def rating_threshold( histograms, countries, dimensao, nota, maior_ou_menor ):
+    grupos = DIMENSIONS[dimensao]
+    df_aux = histograms.select( countries, 'aggregate_rating' )
+    if maior_ou_menor == 'maior':
+        linhas_selecionadas = df_aux['aggregate_rating'] >= nota
+    else:
+        linhas_selecionadas = df_aux['aggregate_rating'] <= nota
+
+    total = df_aux.groupby( grupos, observed=True )['count'].sum()
+    dentro = df_aux.loc[linhas_selecionadas].groupby( grupos, observed=True )['count'].sum()
+    resultado = pd.DataFrame( {'restaurantes': dentro.reindex( total.index, fill_value=0 ), 'total': total} )
+    resultado['fracao'] = np.round( resultado['restaurantes'] / resultado['total'], 3 )
+    return ( resultado.loc[resultado['restaurantes'] > 0]
+                      .sort_values( ['restaurantes', 'fracao'], ascending=False )
+                      .reset_index()
+                      .head( 10 ) )
+
+
+# --------------------------------------------------------------------------------
+# Aquecimento
+# --------------------------------------------------------------------------------
+
+# culinárias com destaque na página de culinárias
+FEATURED_CUISINES = ['Italian', 'American', 'Arabian', 'Japanese', 'Home-made', 'Brazilian']
+
+# executa as consultas da visão padrão de cada página (controles nos valores iniciais) para um snapshot.
+# a thread de atualização chama antes de publicar uma nova versão, para o primeiro rerun já achar tudo no cache
+def warm( snapshot, countries ):
+    metrics( snapshot, countries )
+    for coluna in ['restaurant_id', 'city']:
+        countries_by_nunique( snapshot, countries, coluna )
+    for coluna in ['votes', 'average_cost_for_two']:
+        countries_by_mean( snapshot, countries, coluna )
+    for coluna in ['restaurant_id', 'cuisines']:
+        top_cities_by_nunique( snapshot, countries, coluna )
+    top_cities_by_rating( snapshot, countries, 4, 'maior' )
+    top_cities_by_rating( snapshot, countries, 2.5, 'menor' )
+    for culinaria in FEATURED_CUISINES:
+        best_restaurant_by_cuisine( snapshot, countries, culinaria )
+    top_restaurants( snapshot, countries, 20 )
+    for condicao in ['melhor', 'pior']:
+        cuisines_by_rating( snapshot, countries, condicao )
+    percentiles( snapshot, countries, 'aggregate_rating', 'country_name', ( 0.1, 0.25, 0.5, 0.75, 0.9 ) )
+    distribution( snapshot, countries, 'aggregate_rating', 'country_name', None )
+    rating_threshold( snapshot, countries, 'country_name', 4.0, 'maior' )
@@ -0,0 +1,71 @@
+# dataset tratado publicado num arquivo Arrow e mapeado em memória pelos processos do dashboard
+#
+# Uso (um publicador por máquina): python shared.py
+#
+# O publicador lê e trata o csv uma vez, grava o resultado em ZOMATO_SHARED_DATASET e regrava o
+# arquivo sempre que o csv muda. Cada processo do Streamlit/API mapeia o arquivo em memória e monta
+# o DataFrame apontando direto para as páginas dele (sem cópia): números ficam como arrays numpy e
+# textos como string[pyarrow]. As páginas do arquivo ficam no page cache do sistema e são divididas
+# por todos os processos, então a memória de cada um quase não cresce com o tamanho do dataset.
+
+import os
+import json
+import time
+import logging
+
+import pandas as pd
+import pyarrow as pa
+
+
+logger = logging.getLogger( __name__ )
+
+SHARED_PATH = os.environ.get( 'ZOMATO_SHARED_DATASET', os.path.join( os.path.dirname( os.path.abspath( __file__ ) ), 'dataset', 'zomato.arrow' ) )
+
+
+# textos viram string[pyarrow], que usa o buffer do arquivo em vez de criar objetos python
+def _string_mapper( tipo ):
+    if pa.types.is_string( tipo ):
+        return pd.StringDtype( 'pyarrow' )
+    return None
+
+# função que grava o dataset tratado no arquivo compartilhado, ordenado por país.
+# as faixas de linhas de cada país vão nos metadados, para os leitores não precisarem indexar as linhas
+def publish( df1, path=SHARED_PATH ):
+    df1 = df1.sort_values( 'country_name', kind='mergesort' ).reset_index( drop=True )
+    faixas = {pais: [int( posicoes.min() ), int( posicoes.max() ) + 1] for pais, posicoes in df1.groupby( 'country_name' ).indices.items()}
+
+    tabela = pa.Table.from_pandas( df1, preserve_index=False )
+    # string (e não large_string), que é o tipo aceito pelo string[pyarrow]; sem compressão, para permitir o mapeamento
+    schema = pa.schema( [pa.field( campo.name, pa.string() ) if pa.types.is_large_string( campo.type ) else campo for campo in tabela.schema] )
+    tabela = tabela.cast( schema ).replace_schema_metadata( {'country_slices': json.dumps( faixas )} )
+
+    # grava num arquivo temporário e troca de uma vez; quem já mapeou o arquivo antigo continua com ele
+    temporario = path + '.tmp'
+    with pa.OSFile( temporario, 'wb' ) as sink:
+        with pa.ipc.new_file( sink, tabela.schema ) as writer:
+            writer.write_table( tabela )
+    os.replace( temporario, path )
+
+# função que mapeia o arquivo compartilhado e devolve o DataFrame e as faixas de linhas por país
+def attach( path=SHARED_PATH ):
+    mapa = pa.memory_map( path, 'r' )
+    tabela = pa.ipc.open_file( mapa ).read_all()
+    faixas = json.loads( tabela.schema.metadata[b'country_slices'] )
+    df1 = tabela.to_pandas( split_blocks=True, types_mapper=_string_mapper )
+    return df1, {pais: slice( inicio, fim ) for pais, ( inicio, fim ) in faixas.items()}
+
+
+# publicador: mantém o arquivo compartilhado igual à versão atual do csv
+if __name__ == '__main__':
+    from loader import DatasetStore
+
+    logging.basicConfig( level=logging.INFO )
+    store = DatasetStore()
+    publicada = None
+    while True:
+        snapshot = store.current()
+        if snapshot.version != publicada:
+            publish( snapshot.df )
+            publicada = snapshot.version
+            logger.info( 'versão %s publicada em %s', publicada, SHARED_PATH )
+        time.sleep( store.interval )
@@ -0,0 +1,173 @@
+# contagens distintas aproximadas (HyperLogLog) para as métricas de nunique
+#
+# Na carga, cada célula (país, cidade, culinária) ganha um sketch HyperLogLog dos restaurant_id
+# dela. A contagem de restaurantes distintos de qualquer seleção de países vem do merge (máximo
+# elemento a elemento) dos sketches das células escolhidas, sem voltar às linhas. Cidades e
+# culinárias distintas saem direto das chaves das células, que são exatas.
+#
+# A maioria das células tem poucos restaurantes, então elas guardam só os registradores não
+# zerados, como entradas ( célula, registrador, rank ) de 7 bytes. Uma célula só ganha o vetor
+# denso de 2**p registradores quando passa de SPARSE_LIMIT registradores ocupados, ponto em que o
+# vetor denso fica menor que as entradas. Assim a memória acompanha o número de linhas, e não
+# células x 2**p.
+#
+# Configuração por variáveis de ambiente:
+#   ZOMATO_DISTINCT_MODE   exact | approx | auto (padrão: auto)
+#   ZOMATO_HLL_ERROR       erro relativo padrão desejado (padrão: 0.02)
+#   ZOMATO_EXACT_THRESHOLD no modo auto, datasets com menos linhas usam a contagem exata
+
+import os
+import math
+
+import numpy as np
+import pandas as pd
+
+
+DISTINCT_MODE = os.environ.get( 'ZOMATO_DISTINCT_MODE', 'auto' )
+HLL_ERROR = float( os.environ.get( 'ZOMATO_HLL_ERROR', 0.02 ) )
+EXACT_THRESHOLD = int( os.environ.get( 'ZOMATO_EXACT_THRESHOLD', 1_000_000 ) )
+
+CELL_COLUMNS = ['country_name', 'city', 'cuisines']
+
+
+# decide se o dataset deve ganhar sketches ou ficar só com a contagem exata
+def use_sketches( n_linhas ):
+    if DISTINCT_MODE == 'approx':
+        return True
+    if DISTINCT_MODE == 'exact':
+        return False
+    return n_linhas >= EXACT_THRESHOLD
+
+# precisão (log2 do número de registradores) para o erro padrão pedido: erro ~ 1.04 / sqrt( m )
+def precision_for_error( erro ):
+    p = math.ceil( math.log2( ( 1.04 / erro ) ** 2 ) )
+    return min( max( p, 7 ), 16 )
+
+# posição do registrador e rank (posição do primeiro bit 1) de cada valor, tudo vetorizado
+def _hash_ranks( values, p ):
+    hashes = pd.util.hash_array( np.asarray( values ) )
+    posicoes = ( hashes >> np.uint64( 64 - p ) ).astype( np.int64 )
+    resto = hashes << np.uint64( p )
+    ranks = np.full( len( resto ), 64 - p + 1, dtype=np.uint8 )
+    nao_zero = resto != 0
+    ranks[nao_zero] = ( 64 - np.floor( np.log2( resto[nao_zero].astype( np.float64 ) ) ) ).astype( np.uint8 )
+    return posicoes, ranks
+
+# estimativa de cardinalidade de um sketch (1d) ou de vários sketches, um por linha (2d)
+def estimate( registers ):
+    registers = np.atleast_2d( registers )
+    m = registers.shape[1]
+    alpha = 0.7213 / ( 1 + 1.079 / m )
+    estimativa = alpha * m * m / np.sum( np.exp2( -registers.astype( np.float64 ) ), axis=1 )
+    # correção para cardinalidades pequenas (linear counting)
+    zeros = np.count_nonzero( registers == 0, axis=1 )
+    pequenas = ( estimativa <= 2.5 * m ) & ( zeros > 0 )
+    estimativa[pequenas] = m * np.log( m / zeros[pequenas] )
+    return np.rint( estimativa ).astype( np.int64 )
+
+
+class SketchTable:
+    def __init__( self, cells, dense_rows, registers, sparse_cells, sparse_positions, sparse_ranks, p ):
+        # cells: uma linha por célula com as colunas de CELL_COLUMNS e a soma de votos
+        self.cells = cells
+        # linha de cada célula em registers, ou -1 quando a célula está no formato esparso
+        self.dense_rows = dense_rows
+        self.registers = registers
+        # entradas das células esparsas: célula, registrador e rank
+        self.sparse_cells = sparse_cells
+        self.sparse_positions = sparse_positions
+        self.sparse_ranks = sparse_ranks
+        self.p = p
+
+    # junta as tabelas de várias partições (todas com a mesma precisão)
+    @staticmethod
+    def concat( tabelas ):
+        cells = pd.concat( [tabela.cells for tabela in tabelas], ignore_index=True )
+        # as posições de cada tabela são deslocadas pelo que veio antes dela
+        celulas_antes = np.cumsum( [0] + [len( tabela.cells ) for tabela in tabelas[:-1]] )
+        densas_antes = np.cumsum( [0] + [len( tabela.registers ) for tabela in tabelas[:-1]] )
+        dense_rows = np.concatenate( [np.where( tabela.dense_rows >= 0, tabela.dense_rows + antes, -1 )
+                                      for tabela, antes in zip( tabelas, densas_antes )] )
+        registers = np.concatenate( [tabela.registers for tabela in tabelas] )
+        sparse_cells = np.concatenate( [tabela.sparse_cells + antes for tabela, antes in zip( tabelas, celulas_antes )] )
+        sparse_positions = np.concatenate( [tabela.sparse_positions for tabela in tabelas] )
+        sparse_ranks = np.concatenate( [tabela.sparse_ranks for tabela in tabelas] )
+        return SketchTable( cells, dense_rows, registers, sparse_cells, sparse_positions, sparse_ranks, tabelas[0].p )
+
+    def mask( self, countries ):
+        return self.cells['country_name'].isin( countries ).to_numpy()
+
+    # restaurantes distintos na seleção inteira
+    def distinct( self, mask ):
+        if not mask.any():
+            return 0
+        return int( estimate( self._merge( np.where( mask, 0, -1 ), 1 ) )[0] )
+
+    # restaurantes distintos por grupo de células (ex.: por país ou por cidade)
+    def distinct_by( self, mask, colunas ):
+        cells = self.cells.loc[mask, colunas].reset_index( drop=True )
+        if cells.empty:
+            return cells.assign( restaurant_id=np.array( [], dtype=np.int64 ) )
+        # com sort=False os grupos são numerados na ordem em que aparecem, a mesma do drop_duplicates
+        grupos = np.full( len( self.cells ), -1, dtype=np.int64 )
+        grupos[mask] = cells.groupby( colunas, observed=True, sort=False ).ngroup().to_numpy()
+        chaves = cells.loc[~cells.duplicated( colunas )].reset_index( drop=True )
+        return chaves.assign( restaurant_id=estimate( self._merge( grupos, len( chaves ) ) ) )
+
+    # registradores densos de cada grupo, a partir do grupo de cada célula (-1 fica de fora)
+    def _merge( self, grupos, n_grupos ):
+        m = 1 << self.p
+        merged = np.zeros( ( n_grupos, m ), dtype=np.uint8 )
+
+        densas = np.flatnonzero( ( self.dense_rows >= 0 ) & ( grupos >= 0 ) )
+        if len( densas ):
+            ordem = np.argsort( grupos[densas], kind='stable' )
+            densas = densas[ordem]
+            inicios = np.flatnonzero( np.r_[True, np.diff( grupos[densas] ) != 0] )
+            merged[grupos[densas[inicios]]] = np.maximum.reduceat( self.registers[self.dense_rows[densas]], inicios, axis=0 )
+
+        grupo_entrada = grupos[self.sparse_cells]
+        dentro = grupo_entrada >= 0
+        if dentro.any():
+            chaves = grupo_entrada[dentro] * m + self.sparse_positions[dentro]
+            maximos = pd.Series( self.sparse_ranks[dentro] ).groupby( chaves ).max()
+            posicoes = maximos.index.to_numpy()
+            flat = merged.reshape( -1 )
+            flat[posicoes] = np.maximum( flat[posicoes], maximos.to_numpy() )
+        return merged
+
+
+# acima deste número de registradores ocupados a célula passa para o formato denso
+def sparse_limit( p ):
+    return ( 1 << p ) // 8
+
+# função que monta os sketches de restaurant_id por célula (país, cidade, culinária)
+def build_sketch_table( df1, erro=HLL_ERROR ):
+    p = precision_for_error( erro )
+    m = 1 << p
+
+    grupos = df1.groupby( CELL_COLUMNS, observed=True )
+    cell_ids = grupos.ngroup().to_numpy()
+    cells = grupos['votes'].sum().reset_index()
+
+    # máximo do rank por (célula, registrador) via groupby, bem mais rápido que np.maximum.at
+    posicoes, ranks = _hash_ranks( df1['restaurant_id'], p )
+    maximos = pd.Series( ranks ).groupby( cell_ids.astype( np.int64 ) * m + posicoes ).max()
+    chaves = maximos.index.to_numpy()
+    entrada_cells = chaves // m
+    ocupados = np.bincount( entrada_cells, minlength=len( cells ) )
+
+    # células grandes viram vetores densos; as demais ficam só com as entradas
+    densas = ocupados > sparse_limit( p )
+    dense_rows = np.full( len( cells ), -1, dtype=np.int64 )
+    dense_rows[densas] = np.arange( np.count_nonzero( densas ) )
+    registers = np.zeros( ( np.count_nonzero( densas ), m ), dtype=np.uint8 )
+    na_densa = densas[entrada_cells]
+    registers[dense_rows[entrada_cells[na_densa]], chaves[na_densa] % m] = maximos.to_numpy()[na_densa]
+
+    esparsa = ~na_densa
+    return SketchTable( cells, dense_rows, registers,
+                        entrada_cells[esparsa].astype( np.int32 ),
+                        ( chaves[esparsa] % m ).astype( np.uint16 ),
+                        maximos.to_numpy()[esparsa],
+                        p )
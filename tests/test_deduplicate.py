@@ -0,0 +1,65 @@
+import pandas as pd
+import pytest
+
+from loader import deduplicate
+
+
+def _dataset( linhas ):
+    return pd.DataFrame( linhas, columns=['restaurant_id', 'restaurant_name', 'city', 'votes'] )
+
+
+def test_sem_repeticoes_mantem_tudo_e_nao_gera_conflitos():
+    df1 = _dataset( [( 1, 'A', 'Rio', 10 ), ( 2, 'B', 'Rio', 20 )] )
+
+    resultado, conflitos = deduplicate( df1, 'latest' )
+
+    pd.testing.assert_frame_equal( resultado, df1 )
+    assert conflitos.empty
+    assert 'conflict_columns' in conflitos.columns
+
+def test_linhas_identicas_nao_sao_conflito():
+    df1 = _dataset( [( 1, 'A', 'Rio', 10 ), ( 1, 'A', 'Rio', 10 ), ( 2, 'B', 'Rio', 20 )] )
+
+    resultado, conflitos = deduplicate( df1, 'latest' )
+
+    assert resultado['restaurant_id'].tolist() == [1, 2]
+    assert conflitos.empty
+
+def test_conflitos_listam_as_colunas_divergentes():
+    df1 = _dataset( [( 1, 'A', 'Rio', 10 ), ( 1, 'A', 'Recife', 30 ), ( 2, 'B', 'Rio', 20 ), ( 2, 'B', 'Rio', 25 )] )
+
+    _, conflitos = deduplicate( df1, 'latest' )
+
+    colunas = conflitos.groupby( 'restaurant_id' )['conflict_columns'].first().to_dict()
+    assert colunas == {1: 'city, votes', 2: 'votes'}
+    # todas as variantes distintas de cada restaurant_id ficam no relatório
+    assert len( conflitos ) == 4
+
+def test_politica_latest_fica_com_a_ultima_linha():
+    df1 = _dataset( [( 1, 'A', 'Rio', 30 ), ( 2, 'B', 'Rio', 20 ), ( 1, 'A', 'Recife', 10 )] )
+
+    resultado, _ = deduplicate( df1, 'latest' )
+
+    assert resultado.set_index( 'restaurant_id' )['city'].to_dict() == {1: 'Recife', 2: 'Rio'}
+    assert 'restaurant_conflict' not in resultado.columns
+
+def test_politica_votes_fica_com_a_linha_mais_votada_na_ordem_original():
+    df1 = _dataset( [( 2, 'B', 'Rio', 20 ), ( 1, 'A', 'Rio', 30 ), ( 1, 'A', 'Recife', 10 )] )
+
+    resultado, _ = deduplicate( df1, 'votes' )
+
+    assert resultado['restaurant_id'].tolist() == [2, 1]
+    assert resultado.set_index( 'restaurant_id' )['city'].to_dict() == {1: 'Rio', 2: 'Rio'}
+
+def test_politica_flag_fica_com_a_primeira_e_marca_so_os_conflitos():
+    df1 = _dataset( [( 1, 'A', 'Rio', 30 ), ( 1, 'A', 'Recife', 10 ), ( 2, 'B', 'Rio', 20 ), ( 2, 'B', 'Rio', 20 )] )
+
+    resultado, _ = deduplicate( df1, 'flag' )
+
+    resultado = resultado.set_index( 'restaurant_id' )
+    assert resultado['city'].to_dict() == {1: 'Rio', 2: 'Rio'}
+    assert resultado['restaurant_conflict'].to_dict() == {1: True, 2: False}
+
+def test_politica_desconhecida():
+    with pytest.raises( ValueError ):
+        deduplicate( _dataset( [( 1, 'A', 'Rio', 10 )] ), 'first' )
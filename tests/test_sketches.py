@@ -0,0 +1,69 @@
+import numpy as np
+import pandas as pd
+
+import sketches
+from loader import DATASET_PATH, PartitionedStore, prepare_dataset, write_partitions
+from sketches import SketchTable, build_sketch_table, sparse_limit, precision_for_error, HLL_ERROR
+
+
+def _dataset( linhas ):
+    return pd.DataFrame( linhas, columns=['restaurant_id', 'country_name', 'city', 'cuisines', 'votes'] )
+
+def _restaurantes( ids, pais, cidade, culinaria ):
+    return _dataset( [( restaurant_id, pais, cidade, culinaria, 1 ) for restaurant_id in ids] )
+
+
+def test_distinct_by_conta_cada_grupo():
+    df1 = pd.concat( [_restaurantes( range( 10 ), 'India', 'Delhi', 'Indian' ),
+                      _restaurantes( range( 5, 15 ), 'India', 'Delhi', 'Chinese' ),
+                      _restaurantes( range( 100, 103 ), 'India', 'Mumbai', 'Indian' ),
+                      _restaurantes( range( 200, 207 ), 'Qatar', 'Doha', 'Arabian' )], ignore_index=True )
+    tabela = build_sketch_table( df1 )
+
+    por_cidade = tabela.distinct_by( tabela.mask( ['India', 'Qatar'] ), ['country_name', 'city'] )
+
+    # restaurantes que aparecem em duas culinárias da mesma cidade contam uma vez só
+    contagens = por_cidade.set_index( ['country_name', 'city'] )['restaurant_id'].to_dict()
+    assert contagens == {( 'India', 'Delhi' ): 15, ( 'India', 'Mumbai' ): 3, ( 'Qatar', 'Doha' ): 7}
+
+def test_distinct_by_sem_celulas_retorna_vazio():
+    tabela = build_sketch_table( _restaurantes( range( 10 ), 'India', 'Delhi', 'Indian' ) )
+
+    resultado = tabela.distinct_by( tabela.mask( ['Qatar'] ), ['country_name'] )
+
+    assert resultado.empty
+    assert list( resultado.columns ) == ['country_name', 'restaurant_id']
+
+def test_concat_equivale_a_tabela_do_dataset_inteiro():
+    # uma célula grande o bastante para o formato denso em cada partição, as demais esparsas
+    grande = sparse_limit( precision_for_error( HLL_ERROR ) ) * 4
+    india = pd.concat( [_restaurantes( range( grande ), 'India', 'Delhi', 'Indian' ),
+                        _restaurantes( range( 20 ), 'India', 'Mumbai', 'Indian' )], ignore_index=True )
+    qatar = pd.concat( [_restaurantes( range( grande // 2, grande * 2 ), 'Qatar', 'Doha', 'Arabian' ),
+                        _restaurantes( range( 30 ), 'Qatar', 'Doha', 'Indian' )], ignore_index=True )
+    partes = [build_sketch_table( india ), build_sketch_table( qatar )]
+    assert all( ( parte.dense_rows >= 0 ).any() and len( parte.sparse_cells ) for parte in partes )
+
+    juntas = SketchTable.concat( partes )
+    inteira = build_sketch_table( pd.concat( [india, qatar], ignore_index=True ) )
+
+    mascara = juntas.mask( ['India', 'Qatar'] )
+    assert juntas.distinct( mascara ) == inteira.distinct( inteira.mask( ['India', 'Qatar'] ) )
+    colunas = ['country_name', 'city']
+    pd.testing.assert_frame_equal( juntas.distinct_by( mascara, colunas ).sort_values( colunas, ignore_index=True ),
+                                   inteira.distinct_by( inteira.mask( ['India', 'Qatar'] ), colunas ).sort_values( colunas, ignore_index=True ) )
+    # cada partição continua respondendo pelos seus países depois da concatenação
+    assert juntas.distinct( juntas.mask( ['Qatar'] ) ) == partes[1].distinct( np.ones( len( partes[1].cells ), dtype=bool ) )
+
+def test_particoes_usam_o_modo_do_dataset_inteiro( tmp_path, monkeypatch ):
+    df1, _ = prepare_dataset( DATASET_PATH )
+    write_partitions( df1, str( tmp_path ) )
+    # o dataset passa do limite, mas a maioria das partições sozinha não passaria
+    monkeypatch.setattr( sketches, 'DISTINCT_MODE', 'auto' )
+    monkeypatch.setattr( sketches, 'EXACT_THRESHOLD', len( df1 ) // 2 )
+
+    store = PartitionedStore( str( tmp_path ) )
+    snapshot = store.current()
+
+    assert snapshot.partes and all( parte.sketches is not None for parte in snapshot.partes.values() )
+    assert snapshot.sketches is not None
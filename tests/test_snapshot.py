@@ -0,0 +1,38 @@
+import numpy as np
+import pandas as pd
+
+from loader import Snapshot
+
+
+def _snapshot( paises, country_index=None ):
+    df1 = pd.DataFrame( {'country_name': paises, 'votes': np.arange( len( paises ), dtype=np.int64 )} )
+    if country_index is None:
+        country_index = df1.groupby( 'country_name' ).indices
+    return Snapshot( version=1, mtime=0, df=df1, country_index=country_index, histograms=None )
+
+def _esperado( snapshot, countries ):
+    return snapshot.df[snapshot.df['country_name'].isin( countries )]
+
+
+def test_todos_os_paises_retornam_o_proprio_dataframe():
+    snapshot = _snapshot( ['India', 'Qatar', 'India', 'Brazil'] )
+
+    assert snapshot.select( ['Brazil', 'India', 'Qatar', 'Turkey'] ) is snapshot.df
+
+def test_posicoes_mantem_a_ordem_do_dataset():
+    snapshot = _snapshot( ['India', 'Qatar', 'India', 'Brazil'] )
+
+    pd.testing.assert_frame_equal( snapshot.select( ['Qatar', 'India'] ), _esperado( snapshot, ['Qatar', 'India'] ) )
+    assert snapshot.select( ['Turkey'] ).empty
+
+def test_faixas_vizinhas_nao_copiam_as_linhas():
+    paises = ['Brazil'] * 2 + ['India'] * 3 + ['Qatar'] * 2 + ['Turkey']
+    faixas = {'Brazil': slice( 0, 2 ), 'India': slice( 2, 5 ), 'Qatar': slice( 5, 7 ), 'Turkey': slice( 7, 8 )}
+    snapshot = _snapshot( paises, faixas )
+
+    vizinhas = snapshot.select( ['Qatar', 'India'] )
+    pd.testing.assert_frame_equal( vizinhas, _esperado( snapshot, ['Qatar', 'India'] ) )
+    assert np.shares_memory( vizinhas['votes'].to_numpy(), snapshot.df['votes'].to_numpy() )
+
+    separadas = snapshot.select( ['Turkey', 'Brazil'] )
+    pd.testing.assert_frame_equal( separadas, _esperado( snapshot, ['Turkey', 'Brazil'] ) )
@@ -0,0 +1,82 @@
+import numpy as np
+import pandas as pd
+import pytest
+
+from loader import COLORS, COUNTRIES
+from validation import FLOAT_COLUMNS, NUMERIC_COLUMNS, validate
+
+
+def _linha( **valores ):
+    linha = {
+        'restaurant_id': 1, 'restaurant_name': 'A', 'country_code': 30, 'city': 'Rio', 'address': 'Rua 1',
+        'locality': 'Centro', 'locality_verbose': 'Centro, Rio', 'longitude': -43.2, 'latitude': -22.9,
+        'cuisines': 'Brazilian', 'average_cost_for_two': 100, 'currency': 'Brazilian Real(R$)',
+        'has_table_booking': 0, 'has_online_delivery': 0, 'is_delivering_now': 0, 'switch_to_order_menu': 0,
+        'price_range': 2, 'aggregate_rating': 4.1, 'rating_color': '5BA829', 'rating_text': 'Very Good', 'votes': 10,
+    }
+    linha.update( valores )
+    return linha
+
+def _validate( *linhas ):
+    return validate( pd.DataFrame( list( linhas ) ), COLORS, COUNTRIES )
+
+
+def test_dataset_valido_passa_inteiro():
+    validas, quarentena, contagens = _validate( _linha(), _linha( restaurant_id=2 ) )
+
+    assert len( validas ) == 2
+    assert quarentena.empty
+    assert contagens.empty
+
+def test_coluna_obrigatoria_ausente_rejeita_o_arquivo():
+    df1 = pd.DataFrame( [_linha()] ).drop( columns='votes' )
+
+    with pytest.raises( ValueError, match='votes' ):
+        validate( df1, COLORS, COUNTRIES )
+
+def test_valor_faltante_vai_para_a_quarentena():
+    validas, quarentena, contagens = _validate( _linha(), _linha( restaurant_id=2, country_code=np.nan ) )
+
+    assert validas['restaurant_id'].tolist() == [1]
+    assert quarentena['reason'].tolist() == ['country_code faltante']
+    assert contagens.to_dict() == {'country_code faltante': 1}
+
+def test_colunas_inteiras_voltam_a_ser_int64():
+    # o NaN faz o pandas guardar country_code e votes como float; o texto faz restaurant_id ser object
+    validas, _, _ = _validate( _linha( restaurant_id='1' ),
+                               _linha( restaurant_id='2', country_code=np.nan ),
+                               _linha( restaurant_id='3', votes=np.nan ) )
+
+    for coluna in NUMERIC_COLUMNS:
+        esperado = 'float64' if coluna in FLOAT_COLUMNS else 'int64'
+        assert validas[coluna].dtype == esperado, coluna
+
+def test_texto_numerico_e_convertido_e_o_resto_vai_para_a_quarentena():
+    validas, quarentena, _ = _validate( _linha( votes='12' ), _linha( restaurant_id=2, votes='muitos' ) )
+
+    assert validas['votes'].tolist() == [12]
+    assert quarentena['restaurant_id'].tolist() == [2]
+    assert quarentena['reason'].tolist() == ['votes não numérico']
+
+@pytest.mark.parametrize( 'valores, motivo', [
+    ( {'rating_color': '000000'}, 'rating_color desconhecida' ),
+    ( {'country_code': 999}, 'country_code desconhecido' ),
+    ( {'price_range': 5}, 'price_range fora de 1-4' ),
+    ( {'latitude': 91.0}, 'latitude fora de -90..90' ),
+    ( {'longitude': -181.0}, 'longitude fora de -180..180' ),
+    ( {'aggregate_rating': 5.5}, 'aggregate_rating fora de 0-5' ),
+    ( {'votes': -1}, 'votes negativo' ),
+    ( {'average_cost_for_two': -10}, 'average_cost_for_two negativo' ),
+] )
+def test_cada_regra_tem_o_seu_motivo( valores, motivo ):
+    validas, quarentena, contagens = _validate( _linha(), _linha( restaurant_id=2, **valores ) )
+
+    assert validas['restaurant_id'].tolist() == [1]
+    assert quarentena['reason'].tolist() == [motivo]
+    assert contagens.to_dict() == {motivo: 1}
+
+def test_motivos_de_uma_linha_sao_juntados():
+    _, quarentena, contagens = _validate( _linha( rating_color='000000', aggregate_rating=7.0, cuisines=None ) )
+
+    assert quarentena['reason'].tolist() == ['cuisines faltante; rating_color desconhecida; aggregate_rating fora de 0-5']
+    assert contagens.sum() == 3
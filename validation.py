@@ -0,0 +1,79 @@
+# validação do dataset entre a leitura e o enriquecimento
+#
+# Cada regra é uma máscara booleana calculada sobre a coluna inteira, então a validação inteira é
+# uma passada colunar. As linhas que falham em alguma regra vão para a tabela de quarentena, com os
+# motivos na coluna ['reason'], em vez de derrubarem as páginas; o resto segue para a limpeza.
+
+import pandas as pd
+
+
+# colunas obrigatórias (já renomeadas) e quais delas precisam ser numéricas
+REQUIRED_COLUMNS = [
+    'restaurant_id', 'restaurant_name', 'country_code', 'city', 'address', 'locality', 'locality_verbose',
+    'longitude', 'latitude', 'cuisines', 'average_cost_for_two', 'currency', 'has_table_booking',
+    'has_online_delivery', 'is_delivering_now', 'switch_to_order_menu', 'price_range', 'aggregate_rating',
+    'rating_color', 'rating_text', 'votes',
+]
+NUMERIC_COLUMNS = [
+    'restaurant_id', 'country_code', 'longitude', 'latitude', 'average_cost_for_two', 'has_table_booking',
+    'has_online_delivery', 'is_delivering_now', 'switch_to_order_menu', 'price_range', 'aggregate_rating', 'votes',
+]
+FLOAT_COLUMNS = ['longitude', 'latitude', 'aggregate_rating']
+
+
+# função que valida o dataset e separa as linhas válidas da quarentena.
+# colors e countries são os domínios aceitos de ['rating_color'] e ['country_code'].
+# retorna ( válidas, quarentena, contagens ), onde contagens tem as linhas que falharam em cada regra
+def validate( df1, colors, countries ):
+    # sem as colunas não há como validar linha a linha: o arquivo inteiro é rejeitado
+    faltando = [coluna for coluna in REQUIRED_COLUMNS if coluna not in df1.columns]
+    if faltando:
+        raise ValueError( f'colunas obrigatórias ausentes: {", ".join( faltando )}' )
+
+    df1 = df1.copy()
+    regras = {}
+
+    # valores faltantes em qualquer coluna (antes o clean_code removia essas linhas sem avisar)
+    for coluna in df1.columns:
+        faltantes = df1[coluna].isna()
+        if faltantes.any():
+            regras[f'{coluna} faltante'] = faltantes
+
+    # colunas numéricas que vieram como texto são convertidas; o que não converte é inválido
+    for coluna in NUMERIC_COLUMNS:
+        if not pd.api.types.is_numeric_dtype( df1[coluna] ):
+            convertida = pd.to_numeric( df1[coluna], errors='coerce' )
+            invalidos = convertida.isna() & df1[coluna].notna()
+            if invalidos.any():
+                regras[f'{coluna} não numérico'] = invalidos
+            df1[coluna] = convertida
+
+    # domínios, coordenadas e limites
+    regras['rating_color desconhecida'] = ~df1['rating_color'].isin( list( colors ) ) & df1['rating_color'].notna()
+    regras['country_code desconhecido'] = ~df1['country_code'].isin( list( countries ) ) & df1['country_code'].notna()
+    regras['price_range fora de 1-4'] = ~df1['price_range'].isin( [1, 2, 3, 4] ) & df1['price_range'].notna()
+    regras['latitude fora de -90..90'] = ( df1['latitude'].abs() > 90 )
+    regras['longitude fora de -180..180'] = ( df1['longitude'].abs() > 180 )
+    regras['aggregate_rating fora de 0-5'] = ( df1['aggregate_rating'] < 0 ) | ( df1['aggregate_rating'] > 5 )
+    regras['votes negativo'] = df1['votes'] < 0
+    regras['average_cost_for_two negativo'] = df1['average_cost_for_two'] < 0
+
+    mascaras = pd.DataFrame( regras, index=df1.index )
+    invalidas = mascaras.any( axis=1 )
+
+    quarentena = df1.loc[invalidas].copy()
+    motivos = mascaras.loc[invalidas]
+    # o produto das máscaras pelos nomes das regras junta os motivos de cada linha
+    quarentena['reason'] = motivos.dot( motivos.columns + '; ' ).str.rstrip( '; ' )
+
+    contagens = mascaras.sum()
+    contagens = contagens.loc[contagens > 0]
+
+    validas = df1.loc[~invalidas].copy()
+    # colunas inteiras voltam a ser inteiras: viram float tanto na conversão do texto quanto quando o
+    # csv tem uma célula vazia (o pandas lê a coluna inteira como float por causa do NaN)
+    for coluna in NUMERIC_COLUMNS:
+        if coluna not in FLOAT_COLUMNS:
+            validas[coluna] = validas[coluna].astype( 'int64' )
+
+    return validas, quarentena, contagens